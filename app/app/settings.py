@@ -48,6 +48,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "django_otp",
     "django_otp.plugins.otp_totp",
     "django_otp.plugins.otp_static",
@@ -230,3 +231,40 @@ GOOGLE_OAUTH2_CLIENT_ID = os.environ.get("GOOGLE_OAUTH2_CLIENT_ID")
 GOOGLE_OAUTH2_CLIENT_SECRET = os.environ.get("GOOGLE_OAUTH2_CLIENT_SECRET")
 GOOGLE_OAUTH2_REDIRECT = os.environ.get("GOOGLE_OAUTH2_REDIRECT")
 GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY")
+GOOGLE_OAUTH2_TOKEN_URL = os.environ.get(
+    "GOOGLE_OAUTH2_TOKEN_URL", "https://oauth2.googleapis.com/token"
+)
+GOOGLE_USER_INFO_URL = os.environ.get(
+    "GOOGLE_USER_INFO_URL", "https://www.googleapis.com/oauth2/v3/userinfo"
+)
+YOUTUBE_API_BASE_URL = os.environ.get(
+    "YOUTUBE_API_BASE_URL", "https://www.googleapis.com/youtube/v3"
+)
+
+# Shared HTTP client for Google APIs
+GOOGLE_HTTP_POOL_SIZE = int(os.environ.get("GOOGLE_HTTP_POOL_SIZE", 20))
+GOOGLE_HTTP_TIMEOUT = float(os.environ.get("GOOGLE_HTTP_TIMEOUT", 10))
+GOOGLE_HTTP_MAX_RETRIES = int(os.environ.get("GOOGLE_HTTP_MAX_RETRIES", 3))
+GOOGLE_HTTP_BACKOFF_FACTOR = float(os.environ.get("GOOGLE_HTTP_BACKOFF_FACTOR", 0.3))
+
+# Number of concurrent YouTube requests used when fanning out per-playlist calls
+YOUTUBE_FETCH_CONCURRENCY = int(os.environ.get("YOUTUBE_FETCH_CONCURRENCY", 10))
+
+# ETag cache for conditional YouTube Data API requests
+YOUTUBE_ETAG_CACHE_SIZE = int(os.environ.get("YOUTUBE_ETAG_CACHE_SIZE", 500))
+YOUTUBE_ETAG_CACHE_DATABASE = bool(
+    int(os.environ.get("YOUTUBE_ETAG_CACHE_DATABASE", 1))
+)
+
+# YouTube Data API daily quota, and the share kept free from background enrichment
+# so user-triggered syncs can still run late in the quota day
+YOUTUBE_DAILY_QUOTA = int(os.environ.get("YOUTUBE_DAILY_QUOTA", 10000))
+YOUTUBE_QUOTA_ENRICHMENT_RESERVE = int(
+    os.environ.get("YOUTUBE_QUOTA_ENRICHMENT_RESERVE", 1000)
+)
+
+# Upload history kept per channel, and the months of partitions kept around
+UPLOAD_HISTORY_PER_CHANNEL = int(os.environ.get("UPLOAD_HISTORY_PER_CHANNEL", 20))
+UPLOAD_HISTORY_RETENTION_MONTHS = int(
+    os.environ.get("UPLOAD_HISTORY_RETENTION_MONTHS", 12)
+)
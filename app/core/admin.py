@@ -8,6 +8,10 @@ from core.models import (
     UserSubscriptionCollection,
     CustomURL,
     Upload,
+    ApiQuotaUsage,
+    SyncJob,
+    UploadHistory,
+    SubscriptionMembership,
 )
 
 
@@ -58,6 +62,38 @@ class UploadAdmin(admin.ModelAdmin):
     list_display = ("subscription", "title", "upload_time", "last_sync")
 
 
+class UploadHistoryAdmin(admin.ModelAdmin):
+    list_display = ("subscription", "title", "upload_time", "recorded_at")
+    # Rows are addressed by (id, upload_time), which the per-object views and
+    # bulk actions cannot express. The history is written by the sync only.
+    list_display_links = None
+    actions = None
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+class ApiQuotaUsageAdmin(admin.ModelAdmin):
+    list_display = ("date", "call_type", "units", "calls")
+
+
+class SubscriptionMembershipAdmin(admin.ModelAdmin):
+    list_display = ("collection", "subscription", "group")
+    raw_id_fields = ("collection", "subscription", "group")
+
+
+class SyncJobAdmin(admin.ModelAdmin):
+    list_display = ("collection", "status", "progress", "created_at", "finished_at")
+    list_filter = ("status",)
+    exclude = ("access_token",)
+
+
 admin.site.register(User, CustomUserAdmin)
 admin.site.register(Profile, ProfileAdmin)
 admin.site.register(Subscription)
@@ -65,3 +101,7 @@ admin.site.register(UserSubscriptionCollection, UserListAdmin)
 admin.site.register(Group)
 admin.site.register(CustomURL)
 admin.site.register(Upload, UploadAdmin)
+admin.site.register(UploadHistory, UploadHistoryAdmin)
+admin.site.register(ApiQuotaUsage, ApiQuotaUsageAdmin)
+admin.site.register(SyncJob, SyncJobAdmin)
+admin.site.register(SubscriptionMembership, SubscriptionMembershipAdmin)
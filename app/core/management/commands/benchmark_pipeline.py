@@ -0,0 +1,165 @@
+"""
+Django command to benchmark the subscription sync and enrichment pipelines
+against the fake Google APIs
+"""
+
+import math
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import override_settings
+
+from core.models import Group, Subscription, User, UserSubscriptionCollection
+from subscribe.utils.cache import response_cache
+from subscribe.utils.enrichment import ENRICH_BATCH_SIZE, enrich_subscriptions
+from subscribe.utils.fakes import FakeGoogleServer, fake_token
+from subscribe.utils.groups import move_to_group
+from subscribe.utils.quota import flush_quota_usage
+from subscribe.utils.subscriptions import SUBSCRIPTIONS_PAGE_SIZE
+from subscribe.utils.sync import sync_user_subscriptions
+
+
+def parse_ints(value):
+    return [int(item) for item in value.split(",") if item]
+
+
+def pages(size):
+    return max(1, math.ceil(size / SUBSCRIPTIONS_PAGE_SIZE))
+
+
+class QueryCounter:
+    """
+    Count queries without keeping them, unlike CaptureQueriesContext.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure end-to-end sync and enrichment throughput, and the cost of "
+        "grouping and filtering, at different account sizes and concurrency "
+        "levels. Every run is rolled back. The database tier of the ETag cache "
+        "is off, so no run answers from the ETags of an earlier one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="50,500,2000")
+        parser.add_argument("--concurrency", default="1,10,30")
+        parser.add_argument("--latency-ms", type=float, default=30)
+        parser.add_argument("--jitter-ms", type=float, default=0)
+        parser.add_argument("--error-rate", type=float, default=0.0)
+        parser.add_argument("--fixtures", default=None)
+
+    def handle(self, *args, **options):
+        server = FakeGoogleServer(
+            latency_ms=options["latency_ms"],
+            jitter_ms=options["jitter_ms"],
+            error_rate=options["error_rate"],
+            fixture_path=options["fixtures"],
+            seed=0,
+        )
+
+        self.stdout.write(
+            f"{'size':>6} {'conc':>5} {'sync s':>8} {'resync s':>9} "
+            f"{'sync q':>7} {'q/page':>7} {'move s':>7} {'move q':>7} "
+            f"{'filter s':>9} {'enrich s':>9} {'ch/s':>8} {'enrich q':>9} "
+            f"{'requests':>9}"
+        )
+        # The fan-out threads write the cache through their own connections,
+        # which the rollback of a run cannot undo
+        with server, override_settings(
+            YOUTUBE_API_BASE_URL=server.youtube_url,
+            YOUTUBE_DAILY_QUOTA=10**9,
+        ), response_cache.memory_only():
+            for size in parse_ints(options["sizes"]):
+                for concurrency in parse_ints(options["concurrency"]):
+                    with override_settings(YOUTUBE_FETCH_CONCURRENCY=concurrency):
+                        result = self.run_once(server, size)
+                    self.stdout.write(
+                        f"{size:>6} {concurrency:>5} {result['sync']:>8.3f} "
+                        f"{result['resync']:>9.3f} {result['sync_queries']:>7} "
+                        f"{result['sync_queries'] / pages(size):>7.1f} "
+                        f"{result['move']:>7.3f} {result['move_queries']:>7} "
+                        f"{result['filter']:>9.3f} "
+                        f"{result['enrich']:>9.3f} "
+                        f"{size / max(result['enrich'], 1e-9):>8.1f} "
+                        f"{result['enrich_queries']:>9} {result['requests']:>9}"
+                    )
+
+    def run_once(self, server, size):
+        response_cache.clear()
+        server.stats.clear()
+        token = fake_token(size)
+        result = {}
+
+        with transaction.atomic():
+            user = User.objects.create(
+                username=f"benchmark-{size}-{time.monotonic_ns()}",
+                email=f"benchmark-{time.monotonic_ns()}@example.com",
+            )
+            collection = UserSubscriptionCollection.objects.create(user=user.profile)
+
+            queries = QueryCounter()
+            with connection.execute_wrapper(queries):
+                started = time.perf_counter()
+                sync_user_subscriptions(collection, access_token=token)
+                result["sync"] = time.perf_counter() - started
+            result["sync_queries"] = queries.count
+
+            # A second sync answers every page with a 304
+            started = time.perf_counter()
+            sync_user_subscriptions(collection, access_token=token)
+            result["resync"] = time.perf_counter() - started
+
+            # Group every other channel, then list the ungrouped ones
+            group = Group.objects.create(title="Benchmark", user_list=collection)
+            subscription_ids = list(
+                collection.subscriptions.values_list("id", flat=True)
+            )
+            queries = QueryCounter()
+            with connection.execute_wrapper(queries):
+                started = time.perf_counter()
+                move_to_group(collection, subscription_ids[::2], group)
+                result["move"] = time.perf_counter() - started
+            result["move_queries"] = queries.count
+
+            started = time.perf_counter()
+            list(
+                Subscription.objects.filter(
+                    memberships__collection=collection, memberships__group=None
+                ).values_list("id", flat=True)
+            )
+            result["filter"] = time.perf_counter() - started
+
+            subscriptions = list(
+                collection.subscriptions.order_by("id").only(
+                    "id", "channel_id", "uploads_playlist_id"
+                )
+            )
+            queries = QueryCounter()
+            with connection.execute_wrapper(queries):
+                started = time.perf_counter()
+                for offset in range(0, len(subscriptions), ENRICH_BATCH_SIZE):
+                    enrich_subscriptions(
+                        subscriptions[offset : offset + ENRICH_BATCH_SIZE],
+                        access_token=token,
+                    )
+                result["enrich"] = time.perf_counter() - started
+            result["enrich_queries"] = queries.count
+            result["requests"] = sum(
+                count
+                for name, count in server.stats.items()
+                if name.startswith("/youtube")
+            )
+
+            flush_quota_usage()
+            transaction.set_rollback(True)
+
+        return result
@@ -0,0 +1,93 @@
+"""
+Django command to refresh the latest upload of stale channels across all users
+"""
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from subscribe.utils.enrichment import (
+    ENRICH_BATCH_SIZE,
+    enrich_stale_channels,
+    enrichment_lag,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Refresh every stale channel once, whoever follows it, using the server "
+        "API key and the remaining daily quota. With --loop it keeps running and "
+        "picks up channels as they go stale."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=ENRICH_BATCH_SIZE)
+        parser.add_argument("--limit", type=int, default=None)
+        parser.add_argument(
+            "--stale-days",
+            type=int,
+            default=7,
+            help="Refresh channels whose latest upload is older than this.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=None,
+            help="Parallel playlist requests, YOUTUBE_FETCH_CONCURRENCY by default.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running passes instead of exiting after the first one.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=60,
+            help="Seconds to wait after a pass that found nothing to do.",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.GOOGLE_API_KEY:
+            raise CommandError("GOOGLE_API_KEY is required for server-side calls.")
+
+        try:
+            while True:
+                stale_before = timezone.now() - timedelta(days=options["stale_days"])
+                stats = enrich_stale_channels(
+                    batch_size=options["batch_size"],
+                    limit=options["limit"],
+                    stale_before=stale_before,
+                    max_workers=options["concurrency"],
+                )
+                self._report(stats, enrichment_lag(stale_before))
+
+                if not options["loop"]:
+                    break
+                if not stats["batches"] or stats["deferred"]:
+                    time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS("Channel enrichment done."))
+
+    def _report(self, stats, lag):
+        processed = stats["enriched"] + stats["skipped"]
+        throughput = processed / stats["elapsed"] if stats["elapsed"] else 0.0
+        oldest = lag["oldest_sync"]
+        lag_hours = (timezone.now() - oldest).total_seconds() / 3600 if oldest else 0
+
+        self.stdout.write(
+            f"Enriched {stats['enriched']} channels in {stats['batches']} batches, "
+            f"skipped {stats['skipped']} ({throughput:.1f} channels/s, "
+            f"{stats['unchanged']} unchanged uploads not rewritten). "
+            f"Backlog: {lag['stale']} stale, {lag['never_enriched']} never "
+            f"enriched, oldest sync {lag_hours:.1f}h ago."
+        )
+        if stats["deferred"]:
+            self.stdout.write(
+                self.style.WARNING("Quota budget spent, the rest is deferred.")
+            )
@@ -0,0 +1,48 @@
+"""
+Django command to serve the fake YouTube / Google OAuth APIs locally
+"""
+
+from django.core.management.base import BaseCommand
+
+from subscribe.utils.fakes import FakeGoogleServer
+
+
+class Command(BaseCommand):
+    help = "Serve synthetic or recorded Google API fixtures for local runs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--latency-ms", type=float, default=0)
+        parser.add_argument("--jitter-ms", type=float, default=0)
+        parser.add_argument("--error-rate", type=float, default=0.0)
+        parser.add_argument("--error-status", type=int, default=503)
+        parser.add_argument("--account-size", type=int, default=100)
+        parser.add_argument(
+            "--fixtures",
+            default=None,
+            help="Directory of captured <resource>.json responses to serve as recorded.",
+        )
+
+    def handle(self, *args, **options):
+        server = FakeGoogleServer(
+            host=options["host"],
+            port=options["port"],
+            latency_ms=options["latency_ms"],
+            jitter_ms=options["jitter_ms"],
+            error_rate=options["error_rate"],
+            error_status=options["error_status"],
+            default_account_size=options["account_size"],
+            fixture_path=options["fixtures"],
+        )
+
+        self.stdout.write("Point the app at the fake APIs with:")
+        self.stdout.write(f"  YOUTUBE_API_BASE_URL={server.youtube_url}")
+        self.stdout.write(f"  GOOGLE_OAUTH2_TOKEN_URL={server.token_url}")
+        self.stdout.write(f"  GOOGLE_USER_INFO_URL={server.user_info_url}")
+        self.stdout.write(self.style.SUCCESS(f"Serving on {server.url}"))
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
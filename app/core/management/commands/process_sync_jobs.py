@@ -0,0 +1,58 @@
+"""
+Django command to run queued subscription sync jobs
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.models import SyncJob
+from subscribe.utils.jobs import process_sync_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Process the subscription sync queue. Several workers can run side by "
+        "side, each job is claimed by exactly one of them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the queue and exit instead of polling for new jobs.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds to wait between polls of an empty queue.",
+        )
+        parser.add_argument("--max-jobs", type=int, default=None)
+
+    def handle(self, *args, **options):
+        max_jobs = options["max_jobs"]
+        processed_count = 0
+
+        try:
+            while max_jobs is None or processed_count < max_jobs:
+                remaining = None if max_jobs is None else max_jobs - processed_count
+                processed = process_sync_jobs(max_jobs=remaining)
+                for job in processed:
+                    self._report(job)
+                processed_count += len(processed)
+
+                if options["once"]:
+                    break
+                if not processed:
+                    time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed_count} jobs."))
+
+    def _report(self, job):
+        if job.status == SyncJob.STATUS_SUCCEEDED:
+            self.stdout.write(f"Job {job.pk}: synced {job.progress} channels")
+        else:
+            self.stdout.write(self.style.ERROR(f"Job {job.pk}: {job.error}"))
@@ -0,0 +1,44 @@
+"""
+Django command to apply the upload history retention policy
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from subscribe.utils.history import (
+    drop_expired_history,
+    retention_cutoff,
+    trim_upload_history,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Drop upload history partitions older than the retention window and keep "
+        "only the newest uploads of the channels with recent history."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months",
+            type=int,
+            default=settings.UPLOAD_HISTORY_RETENTION_MONTHS,
+            help="Months of history to keep, counting the current one as 0.",
+        )
+        parser.add_argument(
+            "--keep",
+            type=int,
+            default=settings.UPLOAD_HISTORY_PER_CHANNEL,
+            help="Uploads to keep per channel.",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = retention_cutoff(options["months"])
+        dropped = drop_expired_history(cutoff)
+        trimmed = trim_upload_history(options["keep"])
+
+        self.stdout.write(
+            f"Dropped history before {cutoff:%Y-%m} ({dropped}), "
+            f"trimmed {trimmed} uploads beyond {options['keep']} per recent channel."
+        )
+        self.stdout.write(self.style.SUCCESS("Upload history pruned."))
@@ -0,0 +1,23 @@
+"""
+Django command to repair drifted subscription counters
+"""
+
+from django.core.management.base import BaseCommand
+
+from subscribe.utils.counters import reconcile_counts
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount the subscriptions of groups and collections whose counter "
+        "drifted from the membership tables."
+    )
+
+    def handle(self, *args, **options):
+        repaired = reconcile_counts()
+
+        self.stdout.write(
+            f"Repaired {repaired['groups']} groups and "
+            f"{repaired['collections']} collections."
+        )
+        self.stdout.write(self.style.SUCCESS("Subscription counters reconciled."))
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.4 on 2026-10-17 19:34
+
+from django.db import migrations, models
+from django.db.models.functions import Concat, Substr
+
+
+def derive_uploads_playlist_ids(apps, schema_editor):
+    # A channel's uploads playlist is its "UC..." id with the prefix swapped to "UU"
+    Subscription = apps.get_model("core", "Subscription")
+    Subscription.objects.filter(
+        channel_id__startswith="UC", uploads_playlist_id__isnull=True
+    ).update(
+        uploads_playlist_id=Concat(models.Value("UU"), Substr("channel_id", 3)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0002_upload"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="subscription",
+            name="uploads_playlist_id",
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.RunPython(
+            derive_uploads_playlist_ids, reverse_code=migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.4 on 2026-10-17 19:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_subscription_uploads_playlist_id"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CachedApiResponse",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.CharField(max_length=64, unique=True)),
+                ("etag", models.CharField(max_length=255)),
+                ("body", models.JSONField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.4 on 2026-10-17 19:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0004_cachedapiresponse"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ApiQuotaUsage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("call_type", models.CharField(max_length=50)),
+                ("units", models.PositiveIntegerField(default=0)),
+                ("calls", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "unique_together": {("date", "call_type")},
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.4 on 2026-10-17 19:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0006_syncjob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="subscription",
+            name="enrichment_attempted_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="upload",
+            index=models.Index(
+                fields=["last_sync"], name="core_upload_last_sy_c4581f_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.4 on 2026-10-17 19:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_subscription_enrichment_attempted_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="subscription",
+            name="content_hash",
+            field=models.CharField(blank=True, default="", max_length=40),
+        ),
+        migrations.AddField(
+            model_name="upload",
+            name="content_hash",
+            field=models.CharField(blank=True, default="", max_length=40),
+        ),
+    ]
@@ -0,0 +1,101 @@
+# Generated by Django 4.2.4 on 2026-10-17 19:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+# Postgres needs the partition key in the primary key and unique constraints.
+# Monthly partitions are created on demand, see subscribe.utils.history.
+CREATE_PARTITIONED_TABLE = """
+CREATE TABLE core_uploadhistory (
+    id bigint GENERATED BY DEFAULT AS IDENTITY,
+    subscription_id bigint NOT NULL
+        REFERENCES core_subscription (id) DEFERRABLE INITIALLY DEFERRED,
+    title varchar(255) NOT NULL,
+    video_url varchar(200) NOT NULL,
+    video_image_url varchar(200) NULL,
+    upload_time timestamp with time zone NOT NULL,
+    recorded_at timestamp with time zone NOT NULL,
+    PRIMARY KEY (id, upload_time),
+    CONSTRAINT core_uploadhistory_unique_video
+        UNIQUE (subscription_id, video_url, upload_time)
+) PARTITION BY RANGE (upload_time);
+CREATE INDEX core_uploadhistory_newest_idx
+    ON core_uploadhistory (subscription_id, upload_time DESC);
+"""
+
+
+def create_upload_history(apps, schema_editor):
+    schema_editor.execute(CREATE_PARTITIONED_TABLE)
+
+
+def drop_upload_history(apps, schema_editor):
+    # Dropping the parent drops every partition with it
+    schema_editor.execute("DROP TABLE core_uploadhistory")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0008_content_hash"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name="UploadHistory",
+                    fields=[
+                        (
+                            "id",
+                            models.BigAutoField(
+                                auto_created=True,
+                                primary_key=True,
+                                serialize=False,
+                                verbose_name="ID",
+                            ),
+                        ),
+                        ("title", models.CharField(max_length=255)),
+                        ("video_url", models.URLField()),
+                        ("video_image_url", models.URLField(blank=True, null=True)),
+                        ("upload_time", models.DateTimeField()),
+                        (
+                            "recorded_at",
+                            models.DateTimeField(default=django.utils.timezone.now),
+                        ),
+                        (
+                            "subscription",
+                            models.ForeignKey(
+                                on_delete=django.db.models.deletion.CASCADE,
+                                related_name="upload_history",
+                                to="core.subscription",
+                            ),
+                        ),
+                    ],
+                    options={
+                        "indexes": [
+                            models.Index(
+                                fields=["subscription", "-upload_time"],
+                                name="core_uploadhistory_newest_idx",
+                            )
+                        ],
+                    },
+                ),
+                migrations.AddConstraint(
+                    model_name="uploadhistory",
+                    constraint=models.UniqueConstraint(
+                        fields=("subscription", "video_url", "upload_time"),
+                        name="core_uploadhistory_unique_video",
+                    ),
+                ),
+                # The table is created with this primary key, see above
+                migrations.AddConstraint(
+                    model_name="uploadhistory",
+                    constraint=models.UniqueConstraint(
+                        fields=("id", "upload_time"), name="core_uploadhistory_pkey"
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunPython(create_upload_history, drop_upload_history),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.4 on 2026-10-17 19:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0009_uploadhistory"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="upload",
+            index=models.Index(
+                fields=["-upload_time", "-id"], name="core_upload_feed_idx"
+            ),
+        ),
+    ]
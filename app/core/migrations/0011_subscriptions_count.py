@@ -0,0 +1,48 @@
+# Generated by Django 4.2.4 on 2026-10-17 19:56
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_subscriptions(apps, schema_editor):
+    Subscription = apps.get_model("core", "Subscription")
+    for model_name, m2m_name, field in (
+        ("Group", "group", "group"),
+        ("UserSubscriptionCollection", "users_list", "usersubscriptioncollection"),
+    ):
+        through = getattr(Subscription, m2m_name).through
+        counts = (
+            through.objects.filter(**{field: OuterRef("pk")})
+            .values(field)
+            .annotate(total=Count("pk"))
+            .values("total")
+        )
+        apps.get_model("core", model_name).objects.update(
+            subscriptions_count=Coalesce(
+                Subquery(counts, output_field=models.IntegerField()), 0
+            )
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0010_upload_feed_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="group",
+            name="subscriptions_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="usersubscriptioncollection",
+            name="subscriptions_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(
+            count_subscriptions, reverse_code=migrations.RunPython.noop
+        ),
+    ]
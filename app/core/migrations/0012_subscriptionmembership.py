@@ -0,0 +1,149 @@
+# Generated by Django 4.2.4 on 2026-10-17 20:00
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+def copy_memberships(apps, schema_editor):
+    Subscription = apps.get_model("core", "Subscription")
+    SubscriptionMembership = apps.get_model("core", "SubscriptionMembership")
+    CollectionThrough = Subscription.users_list.through
+    GroupThrough = Subscription.group.through
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {SubscriptionMembership._meta.db_table} "
+            "(collection_id, subscription_id) "
+            "SELECT usersubscriptioncollection_id, subscription_id "
+            f"FROM {CollectionThrough._meta.db_table}"
+        )
+
+    # The old m2m signal could leave a channel in several groups of one user,
+    # keep the group it was added to last. Group links of channels the owner no
+    # longer follows have nowhere to go and are dropped.
+    SubscriptionMembership.objects.update(
+        group=Subquery(
+            GroupThrough.objects.filter(
+                subscription=OuterRef("subscription"),
+                group__user_list=OuterRef("collection"),
+            )
+            .order_by("-pk")
+            .values("group")[:1]
+        )
+    )
+
+
+def restore_m2m_tables(apps, schema_editor):
+    Subscription = apps.get_model("core", "Subscription")
+    SubscriptionMembership = apps.get_model("core", "SubscriptionMembership")
+    membership_table = SubscriptionMembership._meta.db_table
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {Subscription.users_list.through._meta.db_table} "
+            "(usersubscriptioncollection_id, subscription_id) "
+            f"SELECT collection_id, subscription_id FROM {membership_table}"
+        )
+        cursor.execute(
+            f"INSERT INTO {Subscription.group.through._meta.db_table} "
+            "(group_id, subscription_id) "
+            f"SELECT group_id, subscription_id FROM {membership_table} "
+            "WHERE group_id IS NOT NULL"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0011_subscriptions_count"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SubscriptionMembership",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "collection",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="memberships",
+                        to="core.usersubscriptioncollection",
+                    ),
+                ),
+                (
+                    "group",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="memberships",
+                        to="core.group",
+                    ),
+                ),
+                (
+                    "subscription",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="memberships",
+                        to="core.subscription",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="subscriptionmembership",
+            index=models.Index(
+                fields=["collection", "group", "subscription"],
+                name="core_membership_group_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="subscriptionmembership",
+            constraint=models.UniqueConstraint(
+                fields=("collection", "subscription"),
+                name="core_membership_unique_subscription",
+            ),
+        ),
+        migrations.RunPython(copy_memberships, reverse_code=restore_m2m_tables),
+        # A field cannot be altered to use a through model, the old link
+        # tables are dropped once their rows are copied.
+        migrations.RemoveField(
+            model_name="subscription",
+            name="group",
+        ),
+        migrations.RemoveField(
+            model_name="subscription",
+            name="users_list",
+        ),
+        migrations.AddField(
+            model_name="subscription",
+            name="group",
+            field=models.ManyToManyField(
+                blank=True,
+                related_name="subscriptions",
+                through="core.SubscriptionMembership",
+                through_fields=("subscription", "group"),
+                to="core.group",
+            ),
+        ),
+        migrations.AddField(
+            model_name="subscription",
+            name="users_list",
+            field=models.ManyToManyField(
+                related_name="subscriptions",
+                through="core.SubscriptionMembership",
+                through_fields=("subscription", "collection"),
+                to="core.usersubscriptioncollection",
+            ),
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 4.2.4 on 2026-10-17 20:04
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+import django.db.models.functions.text
+
+# Titles and descriptions come in every language, so words are not stemmed.
+# The trigger also covers the bulk upserts of the sync, which bypass save().
+CREATE_SEARCH_TRIGGER = """
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE FUNCTION core_subscription_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+CREATE TRIGGER core_subscription_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description ON core_subscription
+    FOR EACH ROW EXECUTE FUNCTION core_subscription_search_vector_update();
+UPDATE core_subscription SET search_vector =
+    setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(description, '')), 'B');
+"""
+DROP_SEARCH_TRIGGER = """
+DROP TRIGGER core_subscription_search_vector_trigger ON core_subscription;
+DROP FUNCTION core_subscription_search_vector_update();
+"""
+
+SEARCH_INDEXES = [
+    django.contrib.postgres.indexes.GinIndex(
+        fields=["search_vector"], name="core_subscription_search_idx"
+    ),
+    django.contrib.postgres.indexes.GinIndex(
+        django.contrib.postgres.indexes.OpClass(
+            django.db.models.functions.text.Upper("title"), name="gin_trgm_ops"
+        ),
+        name="core_subscription_title_trgm",
+    ),
+]
+
+
+def create_search(apps, schema_editor):
+    schema_editor.execute(CREATE_SEARCH_TRIGGER)
+    # Built after the backfill, which is faster than updating the indexes
+    Subscription = apps.get_model("core", "Subscription")
+    for index in SEARCH_INDEXES:
+        schema_editor.add_index(Subscription, index)
+
+
+# pg_trgm is left installed, other objects may depend on it
+def drop_search(apps, schema_editor):
+    Subscription = apps.get_model("core", "Subscription")
+    for index in SEARCH_INDEXES:
+        schema_editor.remove_index(Subscription, index)
+    schema_editor.execute(DROP_SEARCH_TRIGGER)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0012_subscriptionmembership"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="subscription",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                blank=True, editable=False, null=True
+            ),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name="subscription", index=index)
+                for index in SEARCH_INDEXES
+            ],
+        ),
+        migrations.RunPython(create_search, drop_search),
+    ]
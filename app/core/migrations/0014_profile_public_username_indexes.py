@@ -0,0 +1,49 @@
+# Generated by Django 4.2.4 on 2026-10-17 20:10
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+
+# Needs pg_trgm, installed by 0013
+TRIGRAM_INDEX = django.contrib.postgres.indexes.GinIndex(
+    django.contrib.postgres.indexes.OpClass(
+        django.db.models.functions.text.Upper("username"), name="gin_trgm_ops"
+    ),
+    condition=models.Q(("is_public", True)),
+    name="core_profile_public_trgm",
+)
+
+
+def create_trigram_index(apps, schema_editor):
+    schema_editor.add_index(apps.get_model("core", "Profile"), TRIGRAM_INDEX)
+
+
+def drop_trigram_index(apps, schema_editor):
+    schema_editor.remove_index(apps.get_model("core", "Profile"), TRIGRAM_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0013_subscription_search_vector"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="profile",
+            index=models.Index(
+                django.db.models.functions.comparison.Collate(
+                    django.db.models.functions.text.Lower("username"), "C"
+                ),
+                condition=models.Q(("is_public", True)),
+                name="core_profile_public_prefix_c",
+            ),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name="profile", index=TRIGRAM_INDEX),
+            ],
+        ),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.4 on 2026-10-17 20:19
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+ACTIVE_STATUSES = ["queued", "running"]
+
+
+def fail_duplicate_jobs(apps, schema_editor):
+    # Requests that raced each other may have queued several jobs, the oldest
+    # is the one their clients were answered with first
+    SyncJob = apps.get_model("core", "SyncJob")
+    oldest = (
+        SyncJob.objects.filter(
+            collection=OuterRef("collection"), status__in=ACTIVE_STATUSES
+        )
+        .order_by("created_at", "pk")
+        .values("pk")[:1]
+    )
+    SyncJob.objects.filter(status__in=ACTIVE_STATUSES).exclude(
+        pk=Subquery(oldest)
+    ).update(
+        status="failed",
+        error="Superseded by an earlier job.",
+        access_token="",
+        finished_at=timezone.now(),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0014_profile_public_username_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            fail_duplicate_jobs, reverse_code=migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name="syncjob",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("status__in", ACTIVE_STATUSES)),
+                fields=("collection",),
+                name="core_syncjob_one_active_per_collection",
+            ),
+        ),
+    ]
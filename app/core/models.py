@@ -1,7 +1,9 @@
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.db.models import UniqueConstraint
-from django.db.models.functions import Lower
+from django.db.models.functions import Collate, Lower, Upper
 from django.utils import timezone
 
 
@@ -45,6 +47,21 @@ class Profile(models.Model):
         constraints = [
             UniqueConstraint(Lower("username"), name="unique_lower_username")
         ]
+        indexes = [
+            # Username autocomplete only ever looks at public profiles. The C
+            # collation compares bytes, so LIKE 'prefix%' is a range scan
+            # whatever the database collation.
+            models.Index(
+                Collate(Lower("username"), "C"),
+                condition=models.Q(is_public=True),
+                name="core_profile_public_prefix_c",
+            ),
+            GinIndex(
+                OpClass(Upper("username"), name="gin_trgm_ops"),
+                condition=models.Q(is_public=True),
+                name="core_profile_public_trgm",
+            ),
+        ]
 
 
 class CustomURL(models.Model):
@@ -64,6 +81,8 @@ class UserSubscriptionCollection(models.Model):
         Profile, on_delete=models.CASCADE, related_name="user_subscription_list"
     )
     last_data_sync = models.DateTimeField(blank=True, null=True)
+    # Kept in sync by subscribe.utils.counters
+    subscriptions_count = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return str(self.user)
@@ -76,6 +95,8 @@ class Group(models.Model):
         UserSubscriptionCollection, on_delete=models.CASCADE, related_name="user_groups"
     )
     is_public = models.BooleanField(default=False)
+    # Kept in sync by subscribe.utils.counters
+    subscriptions_count = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return self.title
@@ -88,16 +109,86 @@ class Subscription(models.Model):
     title = models.CharField(max_length=100)
     description = models.TextField(max_length=500)
     channel_id = models.CharField(max_length=100, unique=True)
+    uploads_playlist_id = models.CharField(max_length=100, null=True, blank=True)
+    enrichment_attempted_at = models.DateTimeField(null=True, blank=True)
+    # Digest of the synced columns, see SUBSCRIPTION_HASH_FIELDS
+    content_hash = models.CharField(max_length=40, blank=True, default="")
     image_url = models.URLField(null=True, blank=True)
-    group = models.ManyToManyField(Group, related_name="subscriptions", blank=True)
+    # Weighted title and description words, maintained by a Postgres trigger
+    # (see migration 0013) and left empty on other databases
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
+    # Both relations read the same membership rows. ``group`` is read-only, a
+    # signal rejects writes through it, use subscribe.utils.groups instead.
+    group = models.ManyToManyField(
+        Group,
+        related_name="subscriptions",
+        blank=True,
+        through="SubscriptionMembership",
+        through_fields=("subscription", "group"),
+    )
     users_list = models.ManyToManyField(
-        UserSubscriptionCollection, related_name="subscriptions"
+        UserSubscriptionCollection,
+        related_name="subscriptions",
+        through="SubscriptionMembership",
+        through_fields=("subscription", "collection"),
     )
 
+    class Meta:
+        # Postgres only, created by migration 0013
+        indexes = [
+            GinIndex(fields=["search_vector"], name="core_subscription_search_idx"),
+            # Serves title__icontains, which compiles to UPPER(title) LIKE
+            GinIndex(
+                OpClass(Upper("title"), name="gin_trgm_ops"),
+                name="core_subscription_title_trgm",
+            ),
+        ]
+
     def __str__(self):
         return self.title
 
 
+class SubscriptionMembership(models.Model):
+    """
+    A subscription followed by a collection, in at most one of its groups.
+    """
+
+    collection = models.ForeignKey(
+        UserSubscriptionCollection,
+        on_delete=models.CASCADE,
+        related_name="memberships",
+    )
+    subscription = models.ForeignKey(
+        Subscription, on_delete=models.CASCADE, related_name="memberships"
+    )
+    # Null when the subscription is not in any of the collection's groups
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="memberships",
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["collection", "subscription"],
+                name="core_membership_unique_subscription",
+            )
+        ]
+        indexes = [
+            # Serves both a group's members and the "ungroup" filter
+            models.Index(
+                fields=["collection", "group", "subscription"],
+                name="core_membership_group_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.collection} - {self.subscription}"
+
+
 class Upload(models.Model):
     subscription = models.OneToOneField(
         Subscription, on_delete=models.CASCADE, related_name="upload"
@@ -107,6 +198,123 @@ class Upload(models.Model):
     video_image_url = models.URLField(null=True, blank=True)
     last_sync = models.DateTimeField(default=timezone.now)
     upload_time = models.DateTimeField()
+    # Digest of the enriched columns, see UPLOAD_FIELDS
+    content_hash = models.CharField(max_length=40, blank=True, default="")
 
     def __str__(self):
         return f"{self.title} ({self.subscription.title})"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["last_sync"]),
+            # Matches the feed ordering, see FeedView
+            models.Index(fields=["-upload_time", "-id"], name="core_upload_feed_idx"),
+        ]
+
+
+class UploadHistory(models.Model):
+    """
+    Recent uploads of a channel, partitioned by upload month.
+
+    The primary key on the database is ``(id, upload_time)``, as Postgres
+    requires the partition key in every unique constraint. Django only knows
+    single-column primary keys, so ``id`` stands in for it. Nothing enforces
+    its uniqueness beyond the identity sequence, so bulk writes match rows on
+    both columns.
+    """
+
+    subscription = models.ForeignKey(
+        Subscription, on_delete=models.CASCADE, related_name="upload_history"
+    )
+    title = models.CharField(max_length=255)
+    video_url = models.URLField()
+    video_image_url = models.URLField(null=True, blank=True)
+    upload_time = models.DateTimeField()
+    recorded_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.title} ({self.upload_time:%Y-%m-%d})"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["subscription", "video_url", "upload_time"],
+                name="core_uploadhistory_unique_video",
+            ),
+            # The actual primary key
+            models.UniqueConstraint(
+                fields=["id", "upload_time"], name="core_uploadhistory_pkey"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["subscription", "-upload_time"],
+                name="core_uploadhistory_newest_idx",
+            )
+        ]
+
+
+class CachedApiResponse(models.Model):
+    key = models.CharField(max_length=64, unique=True)
+    etag = models.CharField(max_length=255)
+    body = models.JSONField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.key
+
+
+class ApiQuotaUsage(models.Model):
+    date = models.DateField()
+    call_type = models.CharField(max_length=50)
+    units = models.PositiveIntegerField(default=0)
+    calls = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.date} {self.call_type}: {self.units}"
+
+    class Meta:
+        unique_together = ("date", "call_type")
+
+
+class SyncJob(models.Model):
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_SUCCEEDED = "succeeded"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_SUCCEEDED, "Succeeded"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    collection = models.ForeignKey(
+        UserSubscriptionCollection, on_delete=models.CASCADE, related_name="sync_jobs"
+    )
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED
+    )
+    # Only kept while the job is queued, a worker clears it when claiming the
+    # job. A job whose worker died is failed unless a new request refreshed it.
+    access_token = models.TextField(blank=True)
+    progress = models.PositiveIntegerField(default=0)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.collection} ({self.status})"
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "created_at"])]
+        constraints = [
+            # One pending job per collection, concurrent requests share it
+            models.UniqueConstraint(
+                fields=["collection"],
+                condition=models.Q(status__in=["queued", "running"]),
+                name="core_syncjob_one_active_per_collection",
+            )
+        ]
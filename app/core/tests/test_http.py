@@ -0,0 +1,42 @@
+"""
+Test the shared Google HTTP client.
+"""
+
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+
+from core.utils import http
+
+
+@override_settings(
+    GOOGLE_HTTP_POOL_SIZE=7,
+    GOOGLE_HTTP_TIMEOUT=4,
+    GOOGLE_HTTP_MAX_RETRIES=2,
+)
+class GoogleSessionTests(SimpleTestCase):
+    """Test the pooled session."""
+
+    def setUp(self):
+        http._session = None
+        http._session_pid = None
+
+    def test_session_is_reused_within_process(self):
+        """Test the same session is returned on every call."""
+        self.assertIs(http.get_google_session(), http.get_google_session())
+
+    def test_session_is_rebuilt_after_fork(self):
+        """Test a new session is built when the process id changes."""
+        session = http.get_google_session()
+
+        with patch("core.utils.http.os.getpid", return_value=-1):
+            self.assertIsNot(http.get_google_session(), session)
+
+    def test_adapter_uses_settings(self):
+        """Test pool size, timeout and retry policy come from settings."""
+        adapter = http.get_google_session().get_adapter("https://www.googleapis.com")
+
+        self.assertEqual(adapter.timeout, 4)
+        self.assertEqual(adapter._pool_maxsize, 7)
+        self.assertEqual(adapter.max_retries.total, 2)
+        self.assertNotIn("POST", adapter.max_retries.allowed_methods)
@@ -0,0 +1,171 @@
+"""
+Test the keyset pagination.
+"""
+
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db.models import ExpressionWrapper, F, FloatField
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from core.models import (
+    Group,
+    Profile,
+    Subscription,
+    Upload,
+    User,
+    UserSubscriptionCollection,
+)
+from core.utils.pagination import KeysetPagination
+
+SUBSCRIPTIONS_LIST_URL = reverse("subscribe:subscriptions-list-view")
+GROUPS_LIST_URL = reverse("subscribe:detailed_group_list")
+
+
+class KeysetPaginationTests(TestCase):
+    """Test paging list endpoints with cursors."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="viewer", email="viewer@example.com")
+        self.collection = UserSubscriptionCollection.objects.create(
+            user=self.user.profile
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        # Repeated titles make the id tie-break matter
+        for index in range(9):
+            subscription = Subscription.objects.create(
+                title=f"Channel {index % 3}",
+                description="",
+                channel_id=f"UC{index}",
+            )
+            subscription.users_list.add(self.collection)
+
+    def collect(self, url, params):
+        ids = []
+        params = {"cursor": "", **params}
+        while True:
+            res = self.client.get(url, params)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            ids += [item["id"] for item in res.data["results"]]
+            if not res.data["next"]:
+                return ids
+            params = {**params, "cursor": res.data["next"]}
+
+    def paginate(self, queryset, params):
+        paginator = KeysetPagination()
+        request = Request(APIRequestFactory().get("/", params))
+        page = paginator.paginate_queryset(queryset, request)
+        return page, paginator.get_paginated_response([]).data
+
+    def test_pages_follow_requested_ordering(self):
+        """Test every row is returned once in the requested ordering."""
+        ids = self.collect(
+            SUBSCRIPTIONS_LIST_URL, {"ordering": "-title", "page_size": 2}
+        )
+
+        expected = Subscription.objects.order_by("-title", "id").values_list(
+            "id", flat=True
+        )
+        self.assertEqual(ids, list(expected))
+
+    def test_pages_can_follow_an_annotation(self):
+        """Test an annotation such as a search rank can lead the ordering."""
+        queryset = Subscription.objects.annotate(
+            rank=ExpressionWrapper(F("id") % 3, output_field=FloatField())
+        ).order_by("-rank", "id")
+        ids = []
+        params = {"page_size": 2}
+        while True:
+            page, data = self.paginate(queryset, params)
+            ids += [subscription.id for subscription in page]
+            if not data["next"]:
+                break
+            params["cursor"] = data["next"]
+
+        self.assertEqual(ids, [subscription.id for subscription in queryset])
+
+    def test_count_is_optional_and_cached(self):
+        """Test count is skipped by default and cached when requested."""
+        res = self.client.get(SUBSCRIPTIONS_LIST_URL, {"cursor": ""})
+        self.assertIsNone(res.data["count"])
+
+        res = self.client.get(SUBSCRIPTIONS_LIST_URL, {"cursor": "", "count": "true"})
+        self.assertEqual(res.data["count"], 9)
+
+        Subscription.objects.create(
+            title="New", description="", channel_id="UCnew"
+        ).users_list.add(self.collection)
+        res = self.client.get(SUBSCRIPTIONS_LIST_URL, {"cursor": "", "count": "true"})
+        self.assertEqual(res.data["count"], 9)
+
+    def test_previous_cursor_returns_the_page_before(self):
+        """Test following previous from a page returns the page before it."""
+        first = self.client.get(
+            SUBSCRIPTIONS_LIST_URL, {"cursor": "", "page_size": 4, "ordering": "title"}
+        )
+        second = self.client.get(
+            SUBSCRIPTIONS_LIST_URL,
+            {"cursor": first.data["next"], "page_size": 4, "ordering": "title"},
+        )
+        back = self.client.get(
+            SUBSCRIPTIONS_LIST_URL,
+            {"cursor": second.data["previous"], "page_size": 4, "ordering": "title"},
+        )
+
+        self.assertIsNone(first.data["previous"])
+        self.assertEqual(back.data["results"], first.data["results"])
+        self.assertIsNone(back.data["previous"])
+        self.assertEqual(back.data["next"], first.data["next"])
+
+    def test_page_numbers_are_kept_without_cursor(self):
+        """Test clients sending ?page keep the page number envelope."""
+        res = self.client.get(SUBSCRIPTIONS_LIST_URL, {"page": 2, "page_size": 4})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            (res.data["next"], res.data["previous"], res.data["count"]), (3, 1, 9)
+        )
+        expected = Subscription.objects.order_by("id").values_list("id", flat=True)
+        self.assertEqual(
+            [item["id"] for item in res.data["results"]], list(expected[4:8])
+        )
+
+    def test_unsupported_ordering_is_rejected(self):
+        """Test related and nullable fields cannot order a keyset page."""
+        for queryset in (
+            Profile.objects.order_by("user__username"),
+            Upload.objects.order_by("subscription"),
+            Subscription.objects.order_by("image_url"),
+        ):
+            with self.subTest(ordering=queryset.query.order_by):
+                with self.assertRaises(ValidationError):
+                    self.paginate(queryset, {})
+
+    def test_model_ordering_is_followed(self):
+        """Test the model's default ordering is used when none is given."""
+        with patch.object(Subscription._meta, "ordering", ["-title"]):
+            page, _ = self.paginate(Subscription.objects.all(), {"page_size": 3})
+
+        expected = Subscription.objects.order_by("-title", "id").values_list(
+            "id", flat=True
+        )
+        self.assertEqual([subscription.id for subscription in page], list(expected[:3]))
+
+    def test_view_page_size_does_not_leak(self):
+        """Test a view's page size does not change other views."""
+        for index in range(7):
+            Group.objects.create(title=f"Group {index}", user_list=self.collection)
+
+        groups = self.client.get(GROUPS_LIST_URL)
+        subscriptions = self.client.get(SUBSCRIPTIONS_LIST_URL)
+
+        self.assertEqual(len(groups.data["results"]), 5)
+        self.assertEqual(len(subscriptions.data["results"]), 9)
@@ -0,0 +1,97 @@
+"""
+Test the public user directory.
+"""
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.models import User
+
+USERS_LIST_URL = reverse("user:user-list")
+
+
+class PublicUsersTests(TestCase):
+    """Test listing and autocompleting public profiles."""
+
+    def setUp(self):
+        cache.clear()
+        for username, is_public in (
+            ("alice", True),
+            ("Alicia", True),
+            ("malice", True),
+            ("bob", True),
+            ("alina", False),
+        ):
+            profile = User.objects.create(
+                username=username, email=f"{username}@example.com"
+            ).profile
+            profile.is_public = is_public
+            profile.save()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.get(username="bob"))
+
+    def autocomplete(self, search, **params):
+        return self.client.get(
+            USERS_LIST_URL, {"mode": "autocomplete", "search": search, **params}
+        )
+
+    def test_list_without_search_returns_public_profiles(self):
+        """Test a missing search lists every public profile."""
+        res = self.client.get(USERS_LIST_URL)
+
+        self.assertEqual(
+            sorted(item["username"] for item in res.data["results"]),
+            ["Alicia", "alice", "bob", "malice"],
+        )
+
+    def test_autocomplete_matches_prefix_of_public_profiles(self):
+        """Test prefix matches come first in username order, private ones never."""
+        res = self.autocomplete("ALI")
+
+        self.assertEqual(
+            [item["username"] for item in res.data["results"]],
+            ["alice", "Alicia", "malice"],
+        )
+        self.assertNotIn("count", res.data)
+
+    def test_autocomplete_tops_up_only_short_pages(self):
+        """Test containing matches are only added after the prefix matches."""
+        res = self.autocomplete("ali", limit=2)
+
+        self.assertEqual(
+            [item["username"] for item in res.data["results"]], ["alice", "Alicia"]
+        )
+
+    def test_autocomplete_prefix_with_punctuation(self):
+        """Test underscores and dots in the prefix are matched literally."""
+        for username in ("al_ex", "al.ex", "alex", "al_"):
+            profile = User.objects.create(
+                username=username, email=f"{username}@example.com"
+            ).profile
+            profile.is_public = True
+            profile.save()
+
+        res = self.autocomplete("AL_")
+
+        self.assertEqual(
+            [item["username"] for item in res.data["results"]], ["al_", "al_ex"]
+        )
+
+    def test_autocomplete_limit_is_bounded(self):
+        """Test the limit is honoured and capped."""
+        res = self.autocomplete("a", limit=1)
+        self.assertEqual(len(res.data["results"]), 1)
+
+        res = self.autocomplete("", limit=1000)
+        self.assertEqual(res.data["results"], [])
+
+    def test_autocomplete_caches_hot_prefixes(self):
+        """Test a repeated prefix is answered from the cache."""
+        self.autocomplete("bo")
+
+        with self.assertNumQueries(0):
+            res = self.autocomplete(" Bo ")
+
+        self.assertEqual([item["username"] for item in res.data["results"]], ["bob"])
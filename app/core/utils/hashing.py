@@ -0,0 +1,10 @@
+import hashlib
+import json
+
+
+def content_hash(*values):
+    """
+    Return a stable digest of ``values``, used to detect unchanged rows.
+    """
+    raw = json.dumps(values, default=str, separators=(",", ":"))
+    return hashlib.sha1(raw.encode()).hexdigest()
@@ -0,0 +1,74 @@
+import os
+import threading
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that applies a default timeout to every request sent through it.
+    """
+
+    def __init__(self, *args, timeout=None, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def build_google_session() -> requests.Session:
+    """
+    Build a session with pooled keep-alive connections and a retry policy.
+
+    Only idempotent GET requests are retried; the OAuth token exchange is a POST
+    with a single-use code and must not be replayed.
+    """
+    retry = Retry(
+        total=settings.GOOGLE_HTTP_MAX_RETRIES,
+        backoff_factor=settings.GOOGLE_HTTP_BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset({"GET"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = TimeoutHTTPAdapter(
+        timeout=settings.GOOGLE_HTTP_TIMEOUT,
+        pool_connections=settings.GOOGLE_HTTP_POOL_SIZE,
+        pool_maxsize=settings.GOOGLE_HTTP_POOL_SIZE,
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_google_session() -> requests.Session:
+    """
+    Return the per-process session used for every Google API call.
+
+    The session is rebuilt after a fork so uWSGI workers never share sockets
+    inherited from the master process.
+    """
+    global _session, _session_pid
+
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _session_lock:
+            if _session is None or _session_pid != pid:
+                _session = build_google_session()
+                _session_pid = pid
+    return _session
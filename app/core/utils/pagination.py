@@ -1,5 +1,19 @@
+import base64
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import BasePagination, PageNumberPagination
+
+
+def invert(field):
+    return field[1:] if field.startswith("-") else f"-{field}"
 
 
 class StandardResultsSetPagination(PageNumberPagination):
@@ -25,3 +39,257 @@ class StandardResultsSetPagination(PageNumberPagination):
                 "results": data,
             }
         )
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination with the envelope of StandardResultsSetPagination.
+
+    A cursor holds the ordering values of the first or last row of a page, and
+    the next or previous page starts strictly after or before them. No OFFSET
+    is used, so deep pages cost the same as the first one when an index matches
+    the ordering.
+
+    The ordering is the view's ``keyset_ordering`` if set, else the queryset's
+    own ordering (e.g. from OrderingFilter, or the model's ``Meta.ordering``),
+    with the primary key appended as a tie-break. Only non-nullable concrete
+    fields of the model and annotations (e.g. a search rank) can be used,
+    related and nullable fields are rejected with a 400. ``count`` is null
+    unless the client asks for it with ``?count=true``, and is then cached for
+    ``count_cache_timeout`` seconds. Views may set ``page_size``.
+    """
+
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    count_cache_timeout = 60
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.ordering = self.get_ordering(queryset, view)
+        page_size = self.get_page_size(request, view)
+
+        self.count = None
+        if request.query_params.get(self.count_query_param) in ("1", "true"):
+            self.count = self.get_count(queryset)
+
+        backwards, values = False, None
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            backwards, values = self.decode_cursor(cursor)
+
+        # A previous page is read in the inverted ordering from the cursor on
+        ordering = [invert(field) for field in self.ordering] if backwards else None
+        queryset = queryset.order_by(*(ordering or self.ordering))
+        if values is not None:
+            queryset = queryset.filter(self.seek_filter(values, ordering))
+
+        rows = list(queryset[: page_size + 1])
+        has_more = len(rows) > page_size
+        self.page = rows[:page_size]
+        if backwards:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, values is not None
+        return self.page
+
+    def get_ordering(self, queryset, view):
+        ordering = list(
+            getattr(view, "keyset_ordering", None)
+            or queryset.query.order_by
+            or (queryset.query.default_ordering and queryset.model._meta.ordering)
+            or []
+        )
+        pk_name = queryset.model._meta.pk.name
+        ordering = [
+            f"-{pk_name}" if field == "-pk" else pk_name if field == "pk" else field
+            for field in ordering
+        ]
+        self.fields = [self.get_ordering_field(queryset, field) for field in ordering]
+        if not ordering or self.fields[-1][0] != pk_name:
+            ordering.append(pk_name)
+            self.fields.append(self.get_ordering_field(queryset, pk_name))
+        return ordering
+
+    def get_ordering_field(self, queryset, field):
+        """
+        Return the model field or annotation a cursor position is read with.
+        """
+        if not isinstance(field, str):
+            raise ValidationError({"ordering": f"Cannot page by {field}."})
+        name = field.lstrip("-")
+        annotations = queryset.query.annotations
+        if name in annotations:
+            return name, annotations[name].output_field
+        try:
+            model_field = queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            model_field = None
+        if model_field is None or model_field.is_relation or not model_field.concrete:
+            raise ValidationError({"ordering": f"Cannot page by {field}."})
+        if model_field.null:
+            raise ValidationError({"ordering": f"Cannot page by nullable {name}."})
+        return name, model_field
+
+    def get_page_size(self, request, view=None):
+        page_size = getattr(view, "page_size", self.page_size)
+        try:
+            requested = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return page_size
+        if requested <= 0:
+            return page_size
+        return min(requested, self.max_page_size)
+
+    def get_count(self, queryset):
+        key = (
+            "pagination-count:"
+            + hashlib.sha256(str(queryset.query).encode()).hexdigest()
+        )
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, self.count_cache_timeout)
+        return count
+
+    def seek_filter(self, values, ordering=None):
+        """
+        Build ``(a, b, ...) > cursor`` in the ordering's directions, as lookups
+        the planner can use an index for.
+        """
+        ordering = ordering or self.ordering
+        names = [name for name, _ in self.fields]
+
+        def after(position, inclusive=False):
+            lookup = "gt" if not ordering[position].startswith("-") else "lt"
+            if inclusive:
+                lookup += "e"
+            return {f"{names[position]}__{lookup}": values[position]}
+
+        # The leading bound lets the scan start at the cursor
+        seek = Q(**after(0, inclusive=True))
+        following = Q()
+        for position in range(len(names)):
+            equal = {name: values[i] for i, name in enumerate(names[:position])}
+            following |= Q(**equal, **after(position))
+        return seek & following
+
+    def encode_cursor(self, row, backwards=False):
+        # Full precision, DjangoJSONEncoder truncates datetimes to milliseconds
+        values = [
+            value.isoformat() if hasattr(value, "isoformat") else value
+            for value in (getattr(row, name) for name, _ in self.fields)
+        ]
+        raw = json.dumps(
+            {"before" if backwards else "after": values}, cls=DjangoJSONEncoder
+        )
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        """
+        Return whether the cursor points backwards, and its ordering values.
+        """
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            (direction, values), *rest = payload.items()
+            if rest or direction not in ("after", "before"):
+                raise ValueError
+            if len(values) != len(self.fields):
+                raise ValueError
+            return direction == "before", [
+                field.to_python(value) for (_, field), value in zip(self.fields, values)
+            ]
+        except (AttributeError, TypeError, ValueError, DjangoValidationError):
+            raise NotFound("Invalid cursor")
+
+    def get_paginated_response(self, data):
+        next_cursor = previous_cursor = None
+        if self.has_next and self.page:
+            next_cursor = self.encode_cursor(self.page[-1])
+        if self.has_previous and self.page:
+            previous_cursor = self.encode_cursor(self.page[0], backwards=True)
+
+        return Response(
+            {
+                "next": next_cursor,
+                "previous": previous_cursor,
+                "count": self.count,
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True},
+                "previous": {"type": "string", "nullable": True},
+                "count": {"type": "integer", "nullable": True},
+                "results": schema,
+            },
+        }
+
+
+class OptInKeysetPagination(KeysetPagination):
+    """
+    Keyset pagination for endpoints that used to be paged by number.
+
+    Clients opt in by sending ``cursor``, empty for the first page, and then get
+    cursors in ``next`` and ``previous``. Requests without it keep the envelope
+    of StandardResultsSetPagination: ``?page=``, page numbers in ``next`` and
+    ``previous`` and an exact ``count``.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_number_pagination = None
+        if self.cursor_query_param in request.query_params:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.page_number_pagination = StandardResultsSetPagination()
+        self.page_number_pagination.page_size = getattr(
+            view, "page_size", self.page_size
+        )
+        return self.page_number_pagination.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.page_number_pagination is not None:
+            return self.page_number_pagination.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        page_or_cursor = {
+            "oneOf": [{"type": "integer"}, {"type": "string"}],
+            "nullable": True,
+        }
+        return {
+            "type": "object",
+            "properties": {
+                "next": page_or_cursor,
+                "previous": page_or_cursor,
+                "count": {"type": "integer", "nullable": True},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": name,
+                "required": False,
+                "in": "query",
+                "description": description,
+                "schema": {"type": schema_type},
+            }
+            for name, schema_type, description in (
+                ("page", "integer", "Page number, when no cursor is sent."),
+                (
+                    self.cursor_query_param,
+                    "string",
+                    "Page cursor, send it empty to start paging by cursor.",
+                ),
+                (self.page_size_query_param, "integer", "Results per page."),
+                (self.count_query_param, "boolean", "Count the results."),
+            )
+        ]
@@ -1,6 +1,17 @@
+import operator
+import re
+from functools import reduce
+
 import django_filters
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import Cast
+from rest_framework import filters
+
 from core.models import Subscription
 
+SEARCH_WORD_RE = re.compile(r"\w+")
+
 
 class SubscriptionFilter(django_filters.FilterSet):
     group = django_filters.CharFilter(method="filter_by_group")
@@ -10,14 +21,55 @@ class SubscriptionFilter(django_filters.FilterSet):
         fields = ["group"]
 
     def filter_by_group(self, queryset, name, value):
+        user_subscription_list = self.request.user.profile.user_subscription_list
         if value.lower() == "ungroup":
             # Return subscriptions without any group
-            return queryset.exclude(
-                group__user_list=self.request.user.profile.user_subscription_list
+            return queryset.filter(
+                memberships__collection=user_subscription_list,
+                memberships__group=None,
             )
         if value:
-            # Return all subscriptions
-            return queryset.filter(group=value)
+            # Return subscriptions filtered by specific group ID
+            return queryset.filter(
+                memberships__collection=user_subscription_list,
+                memberships__group=value,
+            )
 
-        # Return subscriptions filtered by specific group ID
+        # Return all subscriptions
         return queryset.all()
+
+
+class SubscriptionSearchFilter(filters.SearchFilter):
+    """
+    Ranked full-text search over subscription titles and descriptions.
+
+    Every word of the query matches as a prefix against the trigger-maintained
+    ``search_vector``, and each term also matches as a title substring like
+    SearchFilter did. Both are served by GIN indexes, and results come by
+    relevance unless the client asks for another ordering, so list this backend
+    before OrderingFilter.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+
+        matches = reduce(operator.and_, (Q(title__icontains=term) for term in terms))
+        words = [word for term in terms for word in SEARCH_WORD_RE.findall(term)]
+        if not words:
+            return queryset.filter(matches)
+
+        # Words hold no tsquery syntax, so the raw query cannot be malformed
+        query = SearchQuery(
+            " & ".join(f"{word}:*" for word in words),
+            search_type="raw",
+            config="simple",
+        )
+        # ts_rank is a real, which a cursor cannot round-trip exactly
+        rank = Cast(SearchRank(F("search_vector"), query), FloatField())
+        return (
+            queryset.annotate(rank=rank)
+            .filter(Q(search_vector=query) | matches)
+            .order_by("-rank", "id")
+        )
@@ -1,11 +1,14 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
 
-from core.models import Group, UserSubscriptionCollection
+from core.models import Group, Subscription, UserSubscriptionCollection
 from subscribe.serializers.subscriptions import SubscriptionSerializer
 
 
 class GroupSerializer(serializers.ModelSerializer):
-    subscription_count = serializers.IntegerField(read_only=True)
+    subscription_count = serializers.IntegerField(
+        source="subscriptions_count", read_only=True
+    )
 
     class Meta:
         model = Group
@@ -36,6 +39,23 @@ class AddSubscriptionToGroupSerializer(serializers.Serializer):
     subscription_id = serializers.IntegerField(required=True)
 
 
+GROUP_PREVIEW_SIZE = 5
+
+
+def group_preview_prefetch():
+    """
+    Prefetch the first subscriptions of every group in a single query.
+
+    The sliced queryset is run with ROW_NUMBER() OVER (PARTITION BY group), so
+    a page of groups costs the same whatever its size.
+    """
+    return Prefetch(
+        "subscriptions",
+        queryset=Subscription.objects.order_by("id")[:GROUP_PREVIEW_SIZE],
+        to_attr="preview_subscriptions",
+    )
+
+
 class GroupListSerializer(serializers.ModelSerializer):
     subscriptions = serializers.SerializerMethodField()
     subscriptions_count = serializers.SerializerMethodField()
@@ -45,8 +65,10 @@ class GroupListSerializer(serializers.ModelSerializer):
         fields = ["id", "title", "emoji", "subscriptions", "subscriptions_count"]
 
     def get_subscriptions(self, obj):
-        subscriptions = obj.subscriptions.all()[:5]
+        subscriptions = getattr(obj, "preview_subscriptions", None)
+        if subscriptions is None:
+            subscriptions = obj.subscriptions.order_by("id")[:GROUP_PREVIEW_SIZE]
         return SubscriptionSerializer(subscriptions, many=True).data
 
     def get_subscriptions_count(self, obj):
-        return obj.subscriptions.count()
+        return obj.subscriptions_count
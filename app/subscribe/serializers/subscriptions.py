@@ -1,4 +1,5 @@
-from core.models import Subscription, Group, Upload
+from django.db.models import Prefetch
+from core.models import Subscription, Group, Upload, SyncJob
 from rest_framework import serializers
 
 
@@ -14,6 +15,17 @@ class UploadSerializer(serializers.ModelSerializer):
         fields = ['title', 'video_url', 'video_image_url', 'upload_time']
 
 
+def collection_group_prefetch(collection):
+    """
+    Prefetch the groups of ``collection`` for DetailedSubscriptionSerializer.
+    """
+    return Prefetch(
+        "group",
+        queryset=Group.objects.filter(user_list=collection).order_by("id"),
+        to_attr="collection_groups",
+    )
+
+
 class DetailedSubscriptionSerializer(serializers.ModelSerializer):
     group = serializers.SerializerMethodField()
     upload = UploadSerializer(read_only=True)
@@ -23,17 +35,22 @@ class DetailedSubscriptionSerializer(serializers.ModelSerializer):
         fields = ["id", "title", "description", "channel_id", "image_url", "group", "upload"]
 
     def get_group(self, obj):
-        request = self.context.get("request")
-        if request and request.user and hasattr(request.user, "profile"):
+        groups = getattr(obj, "collection_groups", None)
+        if groups is not None:
+            user_group = groups[0] if groups else None
+        else:
+            request = self.context.get("request")
+            if not (request and request.user and hasattr(request.user, "profile")):
+                return None
             user_subscription_list = request.user.profile.user_subscription_list
 
             # Filter groups to include only those associated with the current user's subscription list
             user_group = obj.group.filter(user_list=user_subscription_list).first()
-            if not user_group:
-                return None
-            serializer = SubscriptionGroupSerializer(user_group, many=False)
-            return serializer.data
-        return None
+
+        if not user_group:
+            return None
+        serializer = SubscriptionGroupSerializer(user_group, many=False)
+        return serializer.data
 
 
 class SubscriptionSerializer(serializers.ModelSerializer):
@@ -41,3 +58,39 @@ class SubscriptionSerializer(serializers.ModelSerializer):
         model = Subscription
         fields = ["id", "title", "description", "channel_id", "image_url"]
         read_only_fields = ["id"]
+
+
+class SyncJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SyncJob
+        fields = [
+            "id",
+            "status",
+            "progress",
+            "result",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+
+
+class FeedChannelSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Subscription
+        fields = ["id", "title", "channel_id", "image_url"]
+
+
+class FeedUploadSerializer(serializers.ModelSerializer):
+    channel = FeedChannelSerializer(source="subscription", read_only=True)
+
+    class Meta:
+        model = Upload
+        fields = [
+            "id",
+            "title",
+            "video_url",
+            "video_image_url",
+            "upload_time",
+            "channel",
+        ]
@@ -1,7 +1,13 @@
 from django.db.models.signals import m2m_changed, pre_save
 from django.dispatch import receiver
 from django.core.exceptions import ValidationError
-from core.models import Group
+from core.models import (
+    Group,
+    Subscription,
+    SubscriptionMembership,
+    UserSubscriptionCollection,
+)
+from subscribe.utils.counters import refresh_collection_counts, refresh_group_counts
 
 MAX_GROUPS_PER_USER = 15
 
@@ -16,19 +22,67 @@ def validate_group_limit(sender, instance, **kwargs):
             )
 
 
-@receiver(m2m_changed, sender=Group.subscriptions.through)
-def update_subscriptions_group(sender, instance, action, reverse, model, **kwargs):
-    if action == "post_add":
-        subscription_id = (
-            instance.subscriptions.through.objects.last()
-        ).subscription_id
-        user_groups = instance.subscriptions.through.objects.last().group.user_list.user_groups.filter(
-            subscriptions=subscription_id
+COUNTED_ACTIONS = ("post_add", "post_remove", "post_clear")
+
+
+def membership_owners(instance):
+    """
+    Return the collections and groups whose counters depend on ``instance``.
+    """
+    if isinstance(instance, Group):
+        return {instance.user_list_id}, {instance.pk}
+    if isinstance(instance, UserSubscriptionCollection):
+        return {instance.pk}, set(instance.user_groups.values_list("pk", flat=True))
+
+    owners = list(
+        SubscriptionMembership.objects.filter(subscription=instance).values_list(
+            "collection_id", "group_id"
+        )
+    )
+    return (
+        {collection_id for collection_id, _ in owners},
+        {group_id for _, group_id in owners if group_id},
+    )
+
+
+GROUP_WRITE_ACTIONS = ("pre_add", "pre_remove", "pre_clear")
+
+
+@receiver(m2m_changed, sender=SubscriptionMembership)
+def block_group_relation_writes(sender, instance, action, model, **kwargs):
+    """
+    Reject writes through ``Subscription.group`` and ``Group.subscriptions``.
+
+    Both relations share the membership rows of ``users_list``: adding through
+    them misses the collection and removing deletes the whole membership.
+    """
+    if action in GROUP_WRITE_ACTIONS and Group in (type(instance), model):
+        raise ValidationError(
+            "Subscriptions are grouped through their membership, use "
+            "subscribe.utils.groups.move_to_group."
         )
-        subscription = model.objects.get(pk=subscription_id)
 
-        # Remove subscription from user's previous groups
-        previous_groups = user_groups.exclude(pk=instance.pk)
-        if len(previous_groups):
-            for prev_group in previous_groups:
-                prev_group.subscriptions.remove(subscription)
+
+@receiver(m2m_changed, sender=SubscriptionMembership)
+def update_subscriptions_counts(sender, instance, action, **kwargs):
+    """
+    Recount the owners touched by an m2m change on either membership relation.
+
+    A change from Subscription's side may move the counters of any collection
+    or group it belonged to before the change, so those are stashed on the
+    ``pre_`` action.
+    """
+    if not isinstance(instance, Subscription):
+        if action in COUNTED_ACTIONS:
+            collections, groups = membership_owners(instance)
+            refresh_collection_counts(collections)
+            refresh_group_counts(groups)
+        return
+
+    if action.startswith("pre_"):
+        instance._membership_owners = membership_owners(instance)
+    elif action in COUNTED_ACTIONS:
+        collections, groups = membership_owners(instance)
+        before = instance.__dict__.pop("_membership_owners", (set(), set()))
+        refresh_collection_counts(collections | before[0])
+        refresh_group_counts(groups | before[1])
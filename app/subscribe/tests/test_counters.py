@@ -0,0 +1,88 @@
+"""
+Test the denormalized subscription counters.
+"""
+
+from io import StringIO
+
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase
+
+from core.models import Group, Subscription, User, UserSubscriptionCollection
+from subscribe.utils.groups import move_to_group
+
+
+class SubscriptionCounterTests(TestCase):
+    """Test counters follow membership changes."""
+
+    def setUp(self):
+        user = User.objects.create(username="viewer", email="viewer@example.com")
+        self.collection = UserSubscriptionCollection.objects.create(user=user.profile)
+        self.group = Group.objects.create(title="Music", user_list=self.collection)
+        self.subscriptions = [
+            Subscription.objects.create(
+                title=f"Channel {index}", description="", channel_id=f"UC{index}"
+            )
+            for index in range(4)
+        ]
+
+    def assertCounts(self, collection_count, group_count):
+        self.collection.refresh_from_db()
+        self.group.refresh_from_db()
+        self.assertEqual(self.collection.subscriptions_count, collection_count)
+        self.assertEqual(self.group.subscriptions_count, group_count)
+
+    def test_counts_follow_changes_from_the_owner(self):
+        """Test adding, grouping, removing and clearing from a collection."""
+        self.collection.subscriptions.add(*self.subscriptions)
+        move_to_group(
+            self.collection, [sub.pk for sub in self.subscriptions[:3]], self.group
+        )
+        self.assertCounts(4, 3)
+
+        move_to_group(self.collection, [self.subscriptions[0].pk])
+        # Unfollowing a grouped subscription also takes it out of the group
+        self.collection.subscriptions.remove(self.subscriptions[2])
+        self.assertCounts(3, 1)
+
+        self.collection.subscriptions.clear()
+        self.assertCounts(0, 0)
+
+    def test_group_relation_is_read_only(self):
+        """Test writes through the group relation are rejected untouched."""
+        subscription = self.subscriptions[0]
+        self.collection.subscriptions.add(subscription)
+        move_to_group(self.collection, [subscription.pk], self.group)
+
+        with self.assertRaises(ValidationError), transaction.atomic():
+            self.group.subscriptions.add(self.subscriptions[1])
+        with self.assertRaises(ValidationError), transaction.atomic():
+            self.group.subscriptions.remove(subscription)
+        with self.assertRaises(ValidationError), transaction.atomic():
+            subscription.group.clear()
+
+        self.assertEqual(list(self.group.subscriptions.all()), [subscription])
+        self.assertCounts(1, 1)
+
+    def test_counts_follow_changes_from_the_subscription(self):
+        """Test changes made through a subscription update its owners."""
+        subscription = self.subscriptions[0]
+
+        subscription.users_list.add(self.collection)
+        move_to_group(self.collection, [subscription.pk], self.group)
+        self.assertCounts(1, 1)
+
+        subscription.users_list.clear()
+        self.assertCounts(0, 0)
+
+    def test_reconcile_repairs_drift(self):
+        """Test the reconcile command fixes counters changed behind its back."""
+        self.collection.subscriptions.add(*self.subscriptions)
+        Group.objects.filter(pk=self.group.pk).update(subscriptions_count=7)
+        out = StringIO()
+
+        call_command("reconcile_subscription_counts", stdout=out)
+
+        self.assertCounts(4, 0)
+        self.assertIn("Repaired 1 groups and 0 collections.", out.getvalue())
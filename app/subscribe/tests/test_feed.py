@@ -0,0 +1,109 @@
+"""
+Test the latest uploads feed.
+"""
+
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Group, Subscription, Upload, User, UserSubscriptionCollection
+from subscribe.utils.groups import move_to_group
+
+FEED_URL = reverse("subscribe:feed")
+
+
+class FeedTests(TestCase):
+    """Test the feed endpoint."""
+
+    def setUp(self):
+        self.user = User.objects.create(username="viewer", email="viewer@example.com")
+        self.collection = UserSubscriptionCollection.objects.create(
+            user=self.user.profile
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        now = timezone.now()
+        self.uploads = []
+        for index in range(7):
+            subscription = Subscription.objects.create(
+                title=f"Channel {index}", description="", channel_id=f"UC{index}"
+            )
+            subscription.users_list.add(self.collection)
+            # Pairs of uploads share a timestamp to exercise the id tie-break
+            self.uploads.append(
+                Upload.objects.create(
+                    subscription=subscription,
+                    title=f"Video {index}",
+                    video_url=f"https://www.youtube.com/watch?v={index}",
+                    upload_time=now - timedelta(hours=index // 2),
+                )
+            )
+
+        unfollowed = Subscription.objects.create(
+            title="Unfollowed", description="", channel_id="UCunfollowed"
+        )
+        Upload.objects.create(
+            subscription=unfollowed,
+            title="Hidden",
+            video_url="https://www.youtube.com/watch?v=hidden",
+            upload_time=now + timedelta(hours=1),
+        )
+
+    def test_pages_through_uploads_newest_first(self):
+        """Test every followed upload is returned once, newest first."""
+        titles = []
+        params = {"page_size": 3}
+        while True:
+            res = self.client.get(FEED_URL, params)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            titles += [upload["title"] for upload in res.data["results"]]
+            if not res.data["next"]:
+                break
+            params["cursor"] = res.data["next"]
+
+        expected = sorted(
+            self.uploads, key=lambda upload: (upload.upload_time, upload.id)
+        )
+        self.assertEqual(titles, [upload.title for upload in reversed(expected)])
+
+    def test_filters_by_group(self):
+        """Test the group filter only returns uploads of that group."""
+        group = Group.objects.create(title="Music", user_list=self.collection)
+        move_to_group(self.collection, [self.uploads[2].subscription_id], group)
+
+        res = self.client.get(FEED_URL, {"group": group.id})
+
+        self.assertEqual(
+            [upload["title"] for upload in res.data["results"]], ["Video 2"]
+        )
+        self.assertEqual(res.data["results"][0]["channel"]["title"], "Channel 2")
+
+    def test_other_users_group_returns_nothing(self):
+        """Test a group of another user does not leak its uploads."""
+        other = User.objects.create(username="other", email="other@example.com")
+        other_collection = UserSubscriptionCollection.objects.create(user=other.profile)
+        group = Group.objects.create(title="Music", user_list=other_collection)
+        other_collection.subscriptions.add(self.uploads[0].subscription)
+        move_to_group(other_collection, [self.uploads[0].subscription_id], group)
+
+        res = self.client.get(FEED_URL, {"group": group.id})
+
+        self.assertEqual(res.data["results"], [])
+
+    def test_invalid_cursor_is_rejected(self):
+        """Test a malformed cursor returns 404 instead of an error."""
+        res = self.client.get(FEED_URL, {"cursor": "not-a-cursor"})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_later_page_is_a_single_query(self):
+        """Test a page after the cursor is one query, with no COUNT or OFFSET."""
+        first = self.client.get(FEED_URL, {"page_size": 2})
+
+        with self.assertNumQueries(1):
+            self.client.get(FEED_URL, {"page_size": 2, "cursor": first.data["next"]})
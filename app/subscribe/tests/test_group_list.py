@@ -0,0 +1,74 @@
+"""
+Test the group list endpoints.
+"""
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.models import Group, Subscription, User, UserSubscriptionCollection
+from subscribe.utils.groups import move_to_group
+
+GROUPS_LIST_URL = reverse("subscribe:detailed_group_list")
+
+
+def public_groups_url(username):
+    return reverse("subscribe:get-public-user-groups", args=[username])
+
+
+class GroupListTests(TestCase):
+    """Test group pages cost a fixed number of queries."""
+
+    def setUp(self):
+        self.user = User.objects.create(username="viewer", email="viewer@example.com")
+        self.profile = self.user.profile
+        self.profile.is_public = True
+        self.profile.save()
+        self.collection = UserSubscriptionCollection.objects.create(user=self.profile)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.created = 0
+
+    def add_groups(self, count):
+        for _ in range(count):
+            index = self.created
+            self.created += 1
+            group = Group.objects.create(
+                title=f"Group {index}", user_list=self.collection, is_public=True
+            )
+            subscriptions = [
+                Subscription.objects.create(
+                    title=f"Channel {index}-{position}",
+                    description="",
+                    channel_id=f"UC{index}-{position}",
+                )
+                for position in range(7)
+            ]
+            self.collection.subscriptions.add(*subscriptions)
+            move_to_group(
+                self.collection,
+                [subscription.pk for subscription in subscriptions],
+                group,
+            )
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url)
+        return len(queries), res
+
+    def test_query_count_does_not_depend_on_group_count(self):
+        """Test a page of one group and a page of five cost the same."""
+        for url in (GROUPS_LIST_URL, public_groups_url(self.profile.username)):
+            Group.objects.all().delete()
+            self.add_groups(1)
+            single, _ = self.count_queries(url)
+            self.add_groups(4)
+            full, res = self.count_queries(url)
+
+            self.assertEqual(single, full)
+            self.assertEqual(len(res.data["results"]), 5)
+            for group in res.data["results"]:
+                self.assertEqual(len(group["subscriptions"]), 5)
+                self.assertEqual(group["subscriptions_count"], 7)
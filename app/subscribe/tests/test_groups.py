@@ -0,0 +1,104 @@
+"""
+Test moving subscriptions between groups.
+"""
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import (
+    Group,
+    Subscription,
+    SubscriptionMembership,
+    User,
+    UserSubscriptionCollection,
+)
+from subscribe.utils.groups import move_to_group
+
+
+def add_to_group_url(group_id):
+    return reverse("subscribe:add_subscription_to_group", args=[group_id])
+
+
+def ungroup_url(subscription_id):
+    return reverse("subscribe:remove_subscription_from_group", args=[subscription_id])
+
+
+class GroupMembershipTests(TestCase):
+    """Test a subscription sits in at most one group per user."""
+
+    def setUp(self):
+        self.user = User.objects.create(username="viewer", email="viewer@example.com")
+        self.collection = UserSubscriptionCollection.objects.create(
+            user=self.user.profile
+        )
+        self.music = Group.objects.create(title="Music", user_list=self.collection)
+        self.news = Group.objects.create(title="News", user_list=self.collection)
+        self.subscriptions = [
+            Subscription.objects.create(
+                title=f"Channel {index}", description="", channel_id=f"UC{index}"
+            )
+            for index in range(3)
+        ]
+        self.collection.subscriptions.add(*self.subscriptions)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def group_of(self, subscription):
+        return SubscriptionMembership.objects.get(
+            collection=self.collection, subscription=subscription
+        ).group
+
+    def test_move_between_groups_is_one_update(self):
+        """Test a move reads the old groups, updates and recounts."""
+        ids = [subscription.pk for subscription in self.subscriptions]
+        move_to_group(self.collection, ids, self.music)
+
+        # Savepoint, select of the old groups, the move and the recount
+        with self.assertNumQueries(5):
+            moved = move_to_group(self.collection, ids[:2], self.news)
+
+        self.assertEqual(moved, 2)
+        self.assertEqual(self.group_of(self.subscriptions[0]), self.news)
+        self.assertEqual(self.group_of(self.subscriptions[2]), self.music)
+        self.music.refresh_from_db()
+        self.news.refresh_from_db()
+        self.assertEqual(self.music.subscriptions_count, 1)
+        self.assertEqual(self.news.subscriptions_count, 2)
+
+    def test_add_moves_out_of_the_previous_group(self):
+        """Test adding to a group leaves the subscription in that group only."""
+        subscription = self.subscriptions[0]
+        move_to_group(self.collection, [subscription.pk], self.music)
+
+        res = self.client.post(
+            add_to_group_url(self.news.id), {"subscription_id": subscription.id}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(subscription.group.all()), [self.news])
+
+        res = self.client.post(
+            add_to_group_url(self.news.id), {"subscription_id": subscription.id}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_ungroup_keeps_the_subscription(self):
+        """Test ungrouping clears the group but keeps the user's subscription."""
+        subscription = self.subscriptions[0]
+        move_to_group(self.collection, [subscription.pk], self.music)
+
+        res = self.client.delete(ungroup_url(subscription.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIsNone(self.group_of(subscription))
+        res = self.client.get(
+            reverse("subscribe:subscriptions-list-view"), {"group": "ungroup"}
+        )
+        self.assertEqual(len(res.data["results"]), 3)
+
+        res = self.client.delete(ungroup_url(subscription.id))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
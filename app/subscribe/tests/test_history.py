@@ -0,0 +1,134 @@
+"""
+Test the upload history and its retention.
+"""
+
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.models import Subscription, Upload, UploadHistory
+from subscribe.utils.history import (
+    add_months,
+    ensure_partitions,
+    month_start,
+    record_upload_history,
+    retention_cutoff,
+    trim_upload_history,
+)
+
+
+def make_upload(subscription, upload_time, title="Video"):
+    return Upload(
+        subscription=subscription,
+        title=title,
+        video_url=f"https://www.youtube.com/watch?v={title}",
+        upload_time=upload_time,
+    )
+
+
+@override_settings(UPLOAD_HISTORY_RETENTION_MONTHS=3)
+class UploadHistoryTests(TestCase):
+    """Test recording, trimming and dropping history."""
+
+    def setUp(self):
+        self.subscription = Subscription.objects.create(
+            title="Channel", description="", channel_id="UCchannel"
+        )
+        self.now = timezone.now()
+
+    def test_record_skips_expired_and_recorded_uploads(self):
+        """Test uploads are recorded once and only within the window."""
+        uploads = [
+            make_upload(self.subscription, self.now, title="new"),
+            make_upload(self.subscription, self.now - timedelta(days=200), "old"),
+        ]
+
+        record_upload_history(uploads)
+        record_upload_history(uploads[:1])
+
+        self.assertEqual(
+            list(UploadHistory.objects.values_list("title", flat=True)), ["new"]
+        )
+
+    def test_rolled_back_partition_is_created_again(self):
+        """Test a partition lost to a rollback does not block later uploads."""
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            record_upload_history([make_upload(self.subscription, self.now, "lost")])
+            raise RuntimeError("rollback")
+
+        record_upload_history([make_upload(self.subscription, self.now, "new")])
+
+        self.assertEqual(
+            list(UploadHistory.objects.values_list("title", flat=True)), ["new"]
+        )
+
+    def test_trim_keeps_newest_uploads_per_channel(self):
+        """Test only the newest uploads of each channel survive a trim."""
+        other = Subscription.objects.create(
+            title="Other", description="", channel_id="UCother"
+        )
+        record_upload_history(
+            [
+                make_upload(self.subscription, self.now - timedelta(days=i), str(i))
+                for i in range(5)
+            ]
+            + [make_upload(other, self.now, title="other")]
+        )
+
+        deleted = trim_upload_history(keep=2)
+
+        self.assertEqual(deleted, 3)
+        self.assertEqual(
+            set(UploadHistory.objects.values_list("title", flat=True)),
+            {"0", "1", "other"},
+        )
+
+    def test_trim_skips_channels_without_recent_history(self):
+        """Test channels with no upload in the newest months are not scanned."""
+        record_upload_history(
+            [
+                make_upload(
+                    self.subscription, self.now - timedelta(days=70 + i), str(i)
+                )
+                for i in range(3)
+            ]
+        )
+
+        self.assertEqual(trim_upload_history(keep=1), 0)
+        self.assertEqual(
+            trim_upload_history(keep=1, since=self.now - timedelta(days=80)), 2
+        )
+
+    def test_prune_command_drops_expired_months(self):
+        """Test history older than the retention window is removed."""
+        record_upload_history([make_upload(self.subscription, self.now, "kept")])
+        expired_month = add_months(month_start(self.now), -5)
+        ensure_partitions([expired_month])
+        UploadHistory.objects.create(
+            subscription=self.subscription,
+            title="expired",
+            video_url="https://www.youtube.com/watch?v=expired",
+            upload_time=expired_month,
+        )
+        # Run the deferred FK checks the commit would, a partition with pending
+        # trigger events cannot be dropped
+        connection.check_constraints()
+        out = StringIO()
+
+        call_command("prune_upload_history", months=3, stdout=out)
+
+        self.assertEqual(
+            list(UploadHistory.objects.values_list("title", flat=True)), ["kept"]
+        )
+        self.assertIn(f"before {retention_cutoff(3):%Y-%m}", out.getvalue())
+
+    def test_add_months_crosses_years(self):
+        """Test month arithmetic across year boundaries."""
+        start = month_start(self.now).replace(year=2024, month=11)
+
+        self.assertEqual(add_months(start, 3).strftime("%Y-%m"), "2025-02")
+        self.assertEqual(add_months(start, -11).strftime("%Y-%m"), "2023-12")
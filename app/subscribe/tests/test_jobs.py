@@ -0,0 +1,266 @@
+"""
+Test the asynchronous subscription sync jobs.
+"""
+
+from datetime import timedelta
+import threading
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.db import IntegrityError, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import SyncJob, User, UserSubscriptionCollection
+from subscribe.utils.cache import response_cache
+from subscribe.utils.fakes import FakeGoogleServer, fake_token
+from subscribe.utils.jobs import claim_sync_job, enqueue_sync_job, process_sync_jobs
+from subscribe.utils.sync import sync_collection_once
+
+SUBSCRIPTIONS_URL = reverse("subscribe:subscriptions-view")
+
+
+def job_status_url(job_id):
+    return reverse("subscribe:sync-job-status", args=[job_id])
+
+
+class SyncJobTests(TestCase):
+    """Test queueing, processing and polling sync jobs."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = FakeGoogleServer().start()
+        cls.settings_override = override_settings(
+            YOUTUBE_API_BASE_URL=cls.server.youtube_url
+        )
+        cls.settings_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        cls.server.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        response_cache.clear()
+        self.user = User.objects.create(username="viewer", email="viewer@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_async_mode_queues_job(self):
+        """Test the sync is queued and answered with 202 and a job id."""
+        res = self.client.get(
+            SUBSCRIPTIONS_URL, {"mode": "async"}, HTTP_X_GOOGLE_TOKEN=fake_token(70)
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        job = SyncJob.objects.get(pk=res.data["job_id"])
+        self.assertEqual(job.status, SyncJob.STATUS_QUEUED)
+        self.assertFalse(
+            self.user.profile.user_subscription_list.subscriptions.exists()
+        )
+
+    def test_pending_job_is_reused(self):
+        """Test a second request does not queue a duplicate job."""
+        collection = UserSubscriptionCollection.objects.create(user=self.user.profile)
+
+        first = enqueue_sync_job(collection, "old-token")
+        second = enqueue_sync_job(collection, "new-token")
+
+        self.assertEqual(first.pk, second.pk)
+        first.refresh_from_db()
+        self.assertEqual(first.access_token, "new-token")
+
+    def test_one_active_job_per_collection(self):
+        """Test the database rejects a second pending job for a collection."""
+        collection = UserSubscriptionCollection.objects.create(user=self.user.profile)
+        job = enqueue_sync_job(collection, "token")
+        job.status = SyncJob.STATUS_RUNNING
+        job.save(update_fields=["status"])
+
+        with self.assertRaises(IntegrityError):
+            SyncJob.objects.create(collection=collection, access_token="token")
+
+    def test_stale_running_job_is_reused(self):
+        """Test a job left by a dead worker takes the new token and no twin."""
+        collection = UserSubscriptionCollection.objects.create(user=self.user.profile)
+        job = SyncJob.objects.create(
+            collection=collection,
+            access_token="old-token",
+            status=SyncJob.STATUS_RUNNING,
+            started_at=timezone.now() - timedelta(hours=1),
+        )
+
+        reused = enqueue_sync_job(collection, "new-token")
+
+        self.assertEqual(reused.pk, job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.access_token, "new-token")
+
+    def test_claimed_job_token_is_cleared(self):
+        """Test the token is only stored while the job is queued."""
+        collection = UserSubscriptionCollection.objects.create(user=self.user.profile)
+        enqueue_sync_job(collection, "token")
+
+        job = claim_sync_job()
+
+        self.assertEqual(job.access_token, "token")
+        job.refresh_from_db()
+        self.assertEqual(job.access_token, "")
+
+    def test_stale_job_without_token_fails(self):
+        """Test a job left by a dead worker is not rerun without a token."""
+        collection = UserSubscriptionCollection.objects.create(user=self.user.profile)
+        job = SyncJob.objects.create(
+            collection=collection,
+            status=SyncJob.STATUS_RUNNING,
+            started_at=timezone.now() - timedelta(hours=1),
+        )
+
+        self.assertIsNone(claim_sync_job())
+        job.refresh_from_db()
+        self.assertEqual(job.status, SyncJob.STATUS_FAILED)
+        self.assertTrue(job.error)
+
+    def test_worker_runs_job_and_status_reports_result(self):
+        """Test a processed job reports its result and forgets the token."""
+        res = self.client.get(
+            SUBSCRIPTIONS_URL, {"mode": "async"}, HTTP_X_GOOGLE_TOKEN=fake_token(70)
+        )
+        out = StringIO()
+
+        call_command("process_sync_jobs", once=True, stdout=out)
+
+        res = self.client.get(job_status_url(res.data["job_id"]))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["status"], SyncJob.STATUS_SUCCEEDED)
+        self.assertEqual(res.data["progress"], 70)
+        self.assertEqual(res.data["result"]["subscriptions_count"], 70)
+        self.assertEqual(SyncJob.objects.get().access_token, "")
+        self.assertIn("Processed 1 jobs.", out.getvalue())
+
+    def test_failed_job_reports_error(self):
+        """Test an API failure marks the job as failed."""
+        collection = UserSubscriptionCollection.objects.create(user=self.user.profile)
+        job = enqueue_sync_job(collection, fake_token(10))
+
+        with override_settings(YOUTUBE_API_BASE_URL=f"{self.server.url}/missing"):
+            process_sync_jobs()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, SyncJob.STATUS_FAILED)
+        self.assertTrue(job.error)
+        self.assertIsNone(claim_sync_job())
+
+    def test_failed_job_keeps_reported_progress(self):
+        """Test a failure does not overwrite the progress the sync reported."""
+        collection = UserSubscriptionCollection.objects.create(user=self.user.profile)
+        job = enqueue_sync_job(collection, fake_token(10))
+
+        def fail_midway(on_progress, **kwargs):
+            on_progress(50)
+            raise RuntimeError("boom")
+
+        with patch("subscribe.utils.jobs.sync_collection_once", fail_midway):
+            process_sync_jobs()
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.progress), (SyncJob.STATUS_FAILED, 50))
+        self.assertEqual(job.access_token, "")
+
+    def test_waiting_caller_shares_finished_sync(self):
+        """Test a sync finished while waiting on the lock is not run again."""
+        collection = UserSubscriptionCollection.objects.create(user=self.user.profile)
+        requested_at = timezone.now()
+        sync_collection_once(collection, fake_token(10), requested_at=requested_at)
+        self.server.stats.clear()
+
+        stats = sync_collection_once(
+            collection, fake_token(10), requested_at=requested_at
+        )
+
+        self.assertIsNone(stats)
+        self.assertEqual(self.server.stats["/youtube/v3/subscriptions"], 0)
+
+    def test_queued_job_shares_sync_done_after_it_was_queued(self):
+        """Test a job reuses a sync that finished after it was queued."""
+        collection = UserSubscriptionCollection.objects.create(user=self.user.profile)
+        job = enqueue_sync_job(collection, fake_token(10))
+        sync_collection_once(collection, fake_token(10), requested_at=job.created_at)
+
+        process_sync_jobs()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, SyncJob.STATUS_SUCCEEDED)
+        self.assertTrue(job.result["is_shared"])
+        self.assertEqual(job.result["subscriptions_count"], 10)
+
+    def test_status_of_other_users_job_is_hidden(self):
+        """Test users cannot poll jobs that are not theirs."""
+        other = User.objects.create(username="other", email="other@example.com")
+        collection = UserSubscriptionCollection.objects.create(user=other.profile)
+        job = enqueue_sync_job(collection, fake_token(10))
+
+        res = self.client.get(job_status_url(job.pk))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class SyncLockTests(TransactionTestCase):
+    """Test concurrent syncs of a collection wait on its advisory lock."""
+
+    def setUp(self):
+        response_cache.clear()
+        # Slow enough pages for the second caller to arrive mid-sync
+        self.server = FakeGoogleServer(latency_ms=50).start()
+        self.addCleanup(self.server.stop)
+        settings_override = override_settings(
+            YOUTUBE_API_BASE_URL=self.server.youtube_url
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        user = User.objects.create(username="viewer", email="viewer@example.com")
+        self.collection = UserSubscriptionCollection.objects.create(user=user.profile)
+
+    def test_overlapping_syncs_are_serialised(self):
+        """Test a caller arriving mid-sync waits, then shares its result."""
+        requested_at = timezone.now()
+        first_page_written = threading.Event()
+        results = {}
+        finished = []
+
+        def sync(name, on_progress=None):
+            try:
+                collection = UserSubscriptionCollection.objects.get(
+                    pk=self.collection.pk
+                )
+                results[name] = sync_collection_once(
+                    collection,
+                    fake_token(120),
+                    requested_at=requested_at,
+                    on_progress=on_progress,
+                )
+                finished.append(name)
+            finally:
+                connections.close_all()
+
+        first = threading.Thread(
+            target=sync,
+            args=("first", lambda synced: first_page_written.set()),
+        )
+        second = threading.Thread(target=sync, args=("second",))
+        first.start()
+        self.assertTrue(first_page_written.wait(timeout=10))
+        second.start()
+        first.join()
+        second.join()
+
+        self.assertEqual(finished, ["first", "second"])
+        self.assertEqual(results["first"]["synced"], 120)
+        self.assertIsNone(results["second"])
+        self.assertEqual(self.server.stats["/youtube/v3/subscriptions"], 3)
@@ -0,0 +1,316 @@
+"""
+Test the sync and enrichment pipelines against the fake Google APIs.
+"""
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.models import (
+    CachedApiResponse,
+    Group,
+    Subscription,
+    Upload,
+    UploadHistory,
+    User,
+    UserSubscriptionCollection,
+)
+from subscribe.utils.cache import response_cache
+from subscribe.utils.enrichment import (
+    enrich_stale_channels,
+    enrich_subscriptions,
+    enrichment_lag,
+)
+from subscribe.utils.fakes import FakeGoogleServer, fake_token
+from subscribe.utils.groups import move_to_group
+from subscribe.utils.sync import (
+    remove_unsynced_subscriptions,
+    sync_user_subscriptions,
+    write_subscriptions_page,
+)
+
+ENRICH_URL = reverse("subscribe:enrich-subscriptions")
+
+
+class FakeGoogleMixin:
+    """Serve the fake Google APIs to the pipelines for the whole class."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = FakeGoogleServer().start()
+        cls.settings_override = override_settings(
+            YOUTUBE_API_BASE_URL=cls.server.youtube_url
+        )
+        cls.settings_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        cls.server.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        response_cache.clear()
+        self.user = User.objects.create(username="viewer", email="viewer@example.com")
+        self.collection = UserSubscriptionCollection.objects.create(
+            user=self.user.profile
+        )
+
+
+class PipelineTests(FakeGoogleMixin, TestCase):
+    """Test the pipelines end to end."""
+
+    def test_resync_removes_unsubscribed_channels(self):
+        """Test channels missing from a later sync are unlinked."""
+        sync_user_subscriptions(self.collection, access_token=fake_token(60))
+        group = Group.objects.create(title="Kept", user_list=self.collection)
+        subscription_ids = list(
+            self.collection.subscriptions.order_by("id").values_list("id", flat=True)
+        )
+        move_to_group(self.collection, subscription_ids[5:25], group)
+        other_user = User.objects.create(username="other", email="other@example.com")
+        other = UserSubscriptionCollection.objects.create(user=other_user.profile)
+        other_group = Group.objects.create(title="Other", user_list=other)
+        other.subscriptions.add(*subscription_ids)
+        move_to_group(other, subscription_ids, other_group)
+
+        # One delete and two recounts, inside a savepoint
+        with self.assertNumQueries(5):
+            stats = remove_unsynced_subscriptions(
+                self.collection, {f"UCfake{index:016d}" for index in range(10)}
+            )
+
+        self.assertEqual(stats, {"removed": 50, "ungrouped": 15})
+        self.assertEqual(self.collection.subscriptions.count(), 10)
+        self.assertEqual(group.subscriptions.count(), 5)
+        self.assertEqual(other_group.subscriptions.count(), 60)
+        self.collection.refresh_from_db()
+        group.refresh_from_db()
+        self.assertEqual(self.collection.subscriptions_count, 10)
+        self.assertEqual(group.subscriptions_count, 5)
+
+    def test_sync_queries_per_page_do_not_grow_with_account_size(self):
+        """Test a page of channels is written with a constant number of queries."""
+        per_page = []
+        for size, page_count in ((50, 1), (150, 3)):
+            response_cache.clear()
+            collection = UserSubscriptionCollection.objects.create(
+                user=User.objects.create(
+                    username=f"size-{size}", email=f"size-{size}@example.com"
+                ).profile
+            )
+            with CaptureQueriesContext(connection) as queries:
+                sync_user_subscriptions(collection, access_token=fake_token(size))
+            per_page.append(len(queries) / page_count)
+
+        self.assertLessEqual(per_page[1], per_page[0])
+
+    def test_unchanged_channels_are_not_rewritten(self):
+        """Test channels already stored by another user's sync are skipped."""
+        sync_user_subscriptions(self.collection, access_token=fake_token(20))
+        Subscription.objects.filter(channel_id="UCfake0000000000000003").update(
+            title="Renamed", content_hash=""
+        )
+        other_user = User.objects.create(username="other", email="other@example.com")
+        other = UserSubscriptionCollection.objects.create(user=other_user.profile)
+
+        stats = sync_user_subscriptions(other, access_token=fake_token(20))
+
+        self.assertEqual(stats["writes_avoided"], 19)
+        self.assertEqual(other.subscriptions.count(), 20)
+        self.assertEqual(
+            Subscription.objects.get(channel_id="UCfake0000000000000003").title,
+            "Fake channel 3",
+        )
+
+    def test_resync_keeps_resolved_playlist_ids(self):
+        """Test a channel without a derivable playlist keeps its resolved one."""
+        subscription = Subscription.objects.create(
+            title="Old",
+            description="",
+            channel_id="HCcustom",
+            uploads_playlist_id="UUx",
+        )
+
+        write_subscriptions_page(
+            self.collection,
+            [
+                {
+                    "title": "New",
+                    "description": "",
+                    "image_url": None,
+                    "channel_id": "HCcustom",
+                    "uploads_playlist_id": None,
+                }
+            ],
+        )
+
+        subscription.refresh_from_db()
+        self.assertEqual(
+            (subscription.title, subscription.uploads_playlist_id), ("New", "UUx")
+        )
+        self.assertEqual(self.collection.subscriptions.get(), subscription)
+
+    def test_write_page_skips_repeated_and_missing_channels(self):
+        """Test one upsert handles a page repeating channels or missing ids."""
+        page = [
+            {
+                "title": title,
+                "description": "",
+                "image_url": None,
+                "channel_id": channel_id,
+                "uploads_playlist_id": None,
+            }
+            for title, channel_id in (
+                ("First", "UCdup"),
+                ("Nameless", ""),
+                ("Second", "UCdup"),
+                ("Also nameless", ""),
+            )
+        ]
+
+        counts = write_subscriptions_page(self.collection, page)
+
+        self.assertEqual(counts, {"written": 1, "unchanged": 0})
+        self.assertEqual(
+            list(self.collection.subscriptions.values_list("channel_id", "title")),
+            [("UCdup", "Second")],
+        )
+
+
+class EnrichmentPipelineTests(FakeGoogleMixin, TransactionTestCase):
+    """
+    Test the enrichment fan-out, whose threads commit through their own
+    connections.
+    """
+
+    def test_sync_and_enrich(self):
+        """Test every page is synced and every channel gets its upload."""
+        stats = sync_user_subscriptions(self.collection, access_token=fake_token(120))
+
+        self.assertEqual(stats["synced"], 120)
+        subscriptions = list(self.collection.subscriptions.order_by("id"))
+        self.assertEqual(len(subscriptions), 120)
+        self.assertTrue(all(sub.uploads_playlist_id for sub in subscriptions))
+
+        result = enrich_subscriptions(subscriptions[:30], access_token=fake_token(120))
+
+        self.assertEqual(result["failed_playlists"], {})
+        self.assertEqual(result["inserted"], 30)
+        self.assertEqual(Upload.objects.count(), 30)
+        self.assertEqual(Upload.objects.values("last_sync").distinct().count(), 1)
+
+    @override_settings(UPLOAD_HISTORY_RETENTION_MONTHS=1200)
+    def test_enrich_records_upload_history(self):
+        """Test new uploads are appended to the history once."""
+        sync_user_subscriptions(self.collection, access_token=fake_token(3))
+        subscriptions = list(self.collection.subscriptions.all())
+
+        enrich_subscriptions(subscriptions, access_token=fake_token(3))
+        response_cache.clear()
+        enrich_subscriptions(subscriptions, access_token=fake_token(3))
+
+        self.assertEqual(UploadHistory.objects.count(), 3)
+
+    def test_enrich_reports_unchanged_and_updated_uploads(self):
+        """Test a second enrichment classifies rows and refreshes last_sync."""
+        sync_user_subscriptions(self.collection, access_token=fake_token(4))
+        subscriptions = list(self.collection.subscriptions.order_by("id"))
+        enrich_subscriptions(subscriptions, access_token=fake_token(4))
+        Upload.objects.filter(subscription=subscriptions[0]).update(
+            title="Old", content_hash=""
+        )
+        first_sync = Upload.objects.first().last_sync
+        response_cache.clear()
+
+        result = enrich_subscriptions(subscriptions, access_token=fake_token(4))
+
+        self.assertEqual(
+            (result["inserted"], result["updated"], result["unchanged"]), (0, 1, 3)
+        )
+        self.assertGreater(Upload.objects.first().last_sync, first_sync)
+
+    def test_benchmark_command(self):
+        """Test the benchmark runs and rolls back its data."""
+        out = StringIO()
+        call_command(
+            "benchmark_pipeline", sizes="5", concurrency="1,2", latency_ms=0, stdout=out
+        )
+
+        self.assertEqual(len(out.getvalue().splitlines()), 3)
+        self.assertEqual(User.objects.count(), 1)
+        self.assertFalse(CachedApiResponse.objects.exists())
+
+    def test_enrich_stale_channels_once_across_users(self):
+        """Test channels shared by several users are refreshed once."""
+        other_user = User.objects.create(username="other", email="other@example.com")
+        other = UserSubscriptionCollection.objects.create(user=other_user.profile)
+        sync_user_subscriptions(self.collection, access_token=fake_token(40))
+        sync_user_subscriptions(other, access_token=fake_token(60))
+        self.server.stats.clear()
+        persisted = CachedApiResponse.objects.count()
+
+        stats = enrich_stale_channels(batch_size=25)
+        rerun = enrich_stale_channels()
+
+        self.assertEqual(stats["enriched"], 60)
+        self.assertEqual(stats["batches"], 3)
+        self.assertEqual(Upload.objects.count(), 60)
+        self.assertEqual(self.server.stats["/youtube/v3/playlistItems"], 60)
+        self.assertEqual(rerun["batches"], 0)
+        # One playlist and three video batches persisted by the fan-out threads
+        self.assertEqual(CachedApiResponse.objects.count() - persisted, 60 + 3)
+
+    def test_channels_without_uploads_are_not_repicked(self):
+        """Test a channel with no uploads waits before being tried again."""
+        sync_user_subscriptions(self.collection, access_token=fake_token(5))
+        empty = Subscription.objects.create(
+            title="Empty", description="", channel_id="UCempty"
+        )
+        empty.users_list.add(self.collection)
+
+        first = enrich_stale_channels()
+        second = enrich_stale_channels()
+
+        self.assertEqual((first["enriched"], first["skipped"]), (5, 1))
+        self.assertEqual(second["batches"], 0)
+        self.assertEqual(enrichment_lag()["never_enriched"], 1)
+
+    @override_settings(GOOGLE_API_KEY="server-key")
+    def test_enrich_channels_command_reports_stats(self):
+        """Test the command reports throughput and backlog."""
+        sync_user_subscriptions(self.collection, access_token=fake_token(8))
+        out = StringIO()
+
+        call_command("enrich_channels", concurrency=2, stdout=out)
+
+        self.assertIn("Enriched 8 channels in 1 batches", out.getvalue())
+        self.assertIn("Backlog: 0 stale, 0 never enriched", out.getvalue())
+
+    @override_settings(GOOGLE_API_KEY="server-key")
+    def test_enrich_view_uses_server_key_without_header(self):
+        """Test the view needs no Google token when the server has a key."""
+        sync_user_subscriptions(self.collection, access_token=fake_token(3))
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        res = client.get(ENRICH_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["inserted"], 3)
+
+    @override_settings(GOOGLE_API_KEY="")
+    def test_enrich_view_requires_header_without_server_key(self):
+        """Test the view rejects requests without a token or server key."""
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        res = client.get(ENRICH_URL)
+
+        self.assertEqual(res.status_code, 400)
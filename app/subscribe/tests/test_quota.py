@@ -0,0 +1,58 @@
+"""
+Test the YouTube quota ledger and budget planning.
+"""
+
+from django.test import TestCase, override_settings
+
+from core.models import ApiQuotaUsage
+from subscribe.utils import quota
+
+
+@override_settings(YOUTUBE_DAILY_QUOTA=100)
+class QuotaTests(TestCase):
+    """Test quota accounting."""
+
+    def setUp(self):
+        quota._pending_units.clear()
+        quota._pending_calls.clear()
+        quota._exhausted_day = None
+
+    def test_flush_accumulates_usage_per_call_type(self):
+        """Test pending charges are added to the daily ledger."""
+        quota.charge_quota("videos.list")
+        quota.charge_quota("videos.list")
+        quota.charge_quota("subscriptions.list", units=0)
+        quota.flush_quota_usage()
+        quota.charge_quota("videos.list")
+        quota.flush_quota_usage()
+
+        usage = ApiQuotaUsage.objects.get(
+            date=quota.quota_day(), call_type="videos.list"
+        )
+        self.assertEqual((usage.units, usage.calls), (3, 3))
+        self.assertEqual(quota.remaining_quota(), 97)
+
+    def test_batch_shrinks_as_budget_runs_low(self):
+        """Test batches are shrunk and then deferred near the budget."""
+        quota.charge_quota("playlistItems.list", units=80)
+
+        self.assertEqual(quota.plan_batch_size(30, fixed_cost=1), 19)
+        self.assertEqual(quota.plan_batch_size(30, fixed_cost=1, reserve=19), 0)
+
+    def test_enrichment_batch_fits_budget_boundary(self):
+        """Test a batch counts every videos and channels call it needs."""
+        quota.charge_quota("playlistItems.list", units=46)
+
+        # 51 channels need 51 playlistItems, 2 videos and 2 channels calls
+        self.assertEqual(quota.estimate_enrichment_cost(51), 55)
+        self.assertEqual(quota.plan_enrichment_batch(100), 50)
+        self.assertEqual(quota.plan_enrichment_batch(100, reserve=51), 1)
+        self.assertEqual(quota.plan_enrichment_batch(100, reserve=52), 0)
+
+    def test_exhausted_quota_is_shared_through_ledger(self):
+        """Test a quotaExceeded answer stops every process after a flush."""
+        quota.mark_quota_exhausted()
+        quota.flush_quota_usage()
+        quota._exhausted_day = None
+
+        self.assertEqual(quota.remaining_quota(), 0)
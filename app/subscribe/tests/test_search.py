@@ -0,0 +1,125 @@
+"""
+Test searching subscriptions.
+"""
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Group, Subscription, User, UserSubscriptionCollection
+from subscribe.utils.groups import move_to_group
+
+SUBSCRIPTIONS_LIST_URL = reverse("subscribe:subscriptions-list-view")
+
+
+class SubscriptionSearchTests(TestCase):
+    """Test the subscription search backend."""
+
+    def setUp(self):
+        self.user = User.objects.create(username="viewer", email="viewer@example.com")
+        self.collection = UserSubscriptionCollection.objects.create(
+            user=self.user.profile
+        )
+        for title, description in (
+            ("Jazz Lessons", "Weekly piano videos"),
+            ("Daily News", "Headlines every morning"),
+            ("Piano Covers", "Pop songs"),
+        ):
+            Subscription.objects.create(
+                title=title, description=description, channel_id=f"UC{title}"
+            ).users_list.add(self.collection)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def search(self, params):
+        res = self.client.get(SUBSCRIPTIONS_LIST_URL, {"cursor": "", **params})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def test_search_matches_title_prefix(self):
+        """Test the start of a title word is enough to find a channel."""
+        data = self.search({"search": "jaz"})
+
+        self.assertEqual([item["title"] for item in data["results"]], ["Jazz Lessons"])
+
+    def test_search_matches_descriptions(self):
+        """Test a word of the description is enough to find a channel."""
+        data = self.search({"search": "headlines"})
+
+        self.assertEqual([item["title"] for item in data["results"]], ["Daily News"])
+
+    def test_title_matches_rank_first(self):
+        """Test a title match outranks a description match."""
+        data = self.search({"search": "piano"})
+
+        self.assertEqual(
+            [item["title"] for item in data["results"]],
+            ["Piano Covers", "Jazz Lessons"],
+        )
+
+    def test_title_substring_matches_without_rank(self):
+        """Test a term inside a title word still matches, ranked last."""
+        Subscription.objects.create(
+            title="Lessons in Jazz", description="", channel_id="UClessons"
+        ).users_list.add(self.collection)
+
+        data = self.search({"search": "esson"})
+
+        self.assertEqual(
+            [item["title"] for item in data["results"]],
+            ["Jazz Lessons", "Lessons in Jazz"],
+        )
+
+    def test_query_syntax_is_not_interpreted(self):
+        """Test tsquery operators in the search are treated as separators."""
+        data = self.search({"search": "pian, 'vid&!"})
+
+        self.assertEqual([item["title"] for item in data["results"]], ["Jazz Lessons"])
+
+    def test_cursor_pages_follow_rank(self):
+        """Test cursor pages walk the ranked results once each."""
+        for index in range(3):
+            Subscription.objects.create(
+                title=f"Piano {index}",
+                description="piano piano",
+                channel_id=f"UCpiano{index}",
+            ).users_list.add(self.collection)
+        expected = self.search({"search": "piano", "page_size": 10})["results"]
+
+        titles = []
+        params = {"search": "piano", "page_size": 2}
+        while True:
+            data = self.search(params)
+            titles += [item["title"] for item in data["results"]]
+            self.assertLessEqual(len(titles), len(expected))
+            if not data["next"]:
+                break
+            params["cursor"] = data["next"]
+
+        self.assertEqual(len(expected), 5)
+        self.assertEqual(titles, [item["title"] for item in expected])
+
+    def test_public_group_subscriptions_are_searchable(self):
+        """Test the public group listing applies the search backend."""
+        self.user.profile.is_public = True
+        self.user.profile.save(update_fields=["is_public"])
+        group = Group.objects.create(
+            title="Music", user_list=self.collection, is_public=True
+        )
+        move_to_group(
+            self.collection,
+            self.collection.subscriptions.values_list("id", flat=True),
+            group,
+        )
+        url = reverse(
+            "subscribe:get-public-group-subscriptions",
+            args=[self.user.profile.id, group.id],
+        )
+
+        res = APIClient().get(url, {"search": "piano"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["title"] for item in res.data], ["Piano Covers", "Jazz Lessons"]
+        )
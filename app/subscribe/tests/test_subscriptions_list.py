@@ -0,0 +1,76 @@
+"""
+Test the subscriptions list endpoint.
+"""
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import Group, Subscription, Upload, User, UserSubscriptionCollection
+from subscribe.utils.groups import move_to_group
+
+SUBSCRIPTIONS_LIST_URL = reverse("subscribe:subscriptions-list-view")
+
+
+class SubscriptionsListTests(TestCase):
+    """Test the subscriptions list costs a fixed number of queries."""
+
+    def setUp(self):
+        self.user = User.objects.create(username="viewer", email="viewer@example.com")
+        self.collection = UserSubscriptionCollection.objects.create(
+            user=self.user.profile
+        )
+        self.group = Group.objects.create(title="Music", user_list=self.collection)
+        other = User.objects.create(username="other", email="other@example.com")
+        self.other_group = Group.objects.create(
+            title="Other",
+            user_list=UserSubscriptionCollection.objects.create(user=other.profile),
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.created = 0
+
+    def add_subscriptions(self, count):
+        for _ in range(count):
+            index = self.created
+            self.created += 1
+            subscription = Subscription.objects.create(
+                title=f"Channel {index}", description="", channel_id=f"UC{index}"
+            )
+            subscription.users_list.add(self.collection)
+            # Another user's group must never leak into this list
+            subscription.users_list.add(self.other_group.user_list)
+            move_to_group(
+                self.other_group.user_list, [subscription.pk], self.other_group
+            )
+            if index % 2:
+                move_to_group(self.collection, [subscription.pk], self.group)
+            Upload.objects.create(
+                subscription=subscription,
+                title=f"Video {index}",
+                video_url=f"https://www.youtube.com/watch?v={index}",
+                upload_time=timezone.now(),
+            )
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(SUBSCRIPTIONS_LIST_URL)
+        return len(queries), res
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        """Test groups and uploads are loaded without per-row queries."""
+        self.add_subscriptions(2)
+        small, _ = self.count_queries()
+        self.add_subscriptions(8)
+        large, res = self.count_queries()
+
+        self.assertEqual(small, large)
+        self.assertEqual(len(res.data["results"]), 10)
+        for item in res.data["results"]:
+            index = int(item["channel_id"][2:])
+            expected = {"id": self.group.id, "title": "Music"} if index % 2 else None
+            self.assertEqual(item["group"], expected)
+            self.assertEqual(item["upload"]["title"], f"Video {index}")
@@ -0,0 +1,180 @@
+"""
+Test the YouTube fetch helpers.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import requests
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+
+from core.models import CachedApiResponse
+from subscribe.utils.cache import response_cache
+from subscribe.utils.subscriptions import (
+    SUBSCRIPTION_ITEM_FIELDS,
+    build_fields_mask,
+    derive_uploads_playlist_id,
+    get_latest_uploads,
+    get_youtube_json,
+    transform_subscriptions,
+)
+
+
+def playlist_response(video_id):
+    response = MagicMock(status_code=200, headers={})
+    response.json.return_value = {
+        "items": [{"snippet": {"resourceId": {"videoId": video_id}}}]
+    }
+    return response
+
+
+@patch("subscribe.utils.subscriptions.get_google_session")
+class GetLatestUploadsTests(TransactionTestCase):
+    """Test the concurrent playlist fan-out."""
+
+    def setUp(self):
+        response_cache.clear()
+
+    def test_results_keep_input_order(self, patched_session):
+        """Test video ids are returned in playlist order."""
+        patched_session.return_value.get.side_effect = lambda url, params, headers: (
+            playlist_response(f"video-{params['playlistId']}")
+        )
+
+        videos, errors = get_latest_uploads(
+            access_token="token", playlist_ids=["a", "b", "c", "d"], max_workers=3
+        )
+
+        self.assertEqual(videos, ["video-a", "video-b", "video-c", "video-d"])
+        self.assertEqual(errors, {})
+
+    def test_errors_are_reported_per_playlist(self, patched_session):
+        """Test a failing playlist does not abort the batch."""
+
+        def get(url, params, headers):
+            if params["playlistId"] == "b":
+                raise requests.exceptions.ConnectionError("boom")
+            return playlist_response(f"video-{params['playlistId']}")
+
+        patched_session.return_value.get.side_effect = get
+
+        videos, errors = get_latest_uploads(
+            access_token="token", playlist_ids=["a", "b", "c"]
+        )
+
+        self.assertEqual(videos, ["video-a", "video-c"])
+        self.assertEqual(list(errors), ["b"])
+
+
+class DeriveUploadsPlaylistIdTests(SimpleTestCase):
+    """Test deriving the uploads playlist from a channel id."""
+
+    def test_channel_prefix_is_swapped(self):
+        """Test "UC" channel ids map to their "UU" uploads playlist."""
+        self.assertEqual(derive_uploads_playlist_id("UCabc123"), "UUabc123")
+
+    def test_unknown_format_is_not_derived(self):
+        """Test ids without the channel prefix are left for channels.list."""
+        self.assertIsNone(derive_uploads_playlist_id("HCabc123"))
+        self.assertIsNone(derive_uploads_playlist_id(""))
+
+
+@patch("subscribe.utils.subscriptions.get_google_session")
+class GetYoutubeJsonTests(TestCase):
+    """Test conditional requests through the ETag cache."""
+
+    def setUp(self):
+        response_cache.clear()
+
+    def test_not_modified_returns_cached_body(self, patched_session):
+        """Test a 304 answer reuses the cached body and sends the ETag."""
+        first = MagicMock(status_code=200, headers={"ETag": '"v1"'})
+        first.json.return_value = {"items": ["cached"]}
+        second = MagicMock(status_code=304, headers={})
+        patched_session.return_value.get.side_effect = [first, second]
+
+        get_youtube_json("videos", {"id": "a"}, access_token="token")
+        body = get_youtube_json("videos", {"id": "a"}, access_token="token")
+
+        self.assertEqual(body, {"items": ["cached"]})
+        _, kwargs = patched_session.return_value.get.call_args
+        self.assertEqual(kwargs["headers"]["If-None-Match"], '"v1"')
+        second.json.assert_not_called()
+
+    def test_cache_is_scoped_by_caller(self, patched_session):
+        """Test another caller never receives a cached ETag."""
+        first = MagicMock(status_code=200, headers={"ETag": '"v1"'})
+        first.json.return_value = {"items": []}
+        patched_session.return_value.get.return_value = first
+        persisted = CachedApiResponse.objects.count()
+
+        get_youtube_json("videos", {"mine": True}, access_token="a")
+        get_youtube_json("videos", {"mine": True}, access_token="b")
+
+        _, kwargs = patched_session.return_value.get.call_args
+        self.assertNotIn("If-None-Match", kwargs["headers"])
+        self.assertEqual(CachedApiResponse.objects.count(), persisted)
+
+    def test_public_resources_are_shared_across_callers(self, patched_session):
+        """Test a public answer is revalidated with another caller's token."""
+        first = MagicMock(status_code=200, headers={"ETag": '"v1"'})
+        first.json.return_value = {"items": ["public"]}
+        second = MagicMock(status_code=304, headers={})
+        patched_session.return_value.get.side_effect = [first, second]
+
+        get_youtube_json("channels", {"id": "UCa"}, access_token="a")
+        response_cache.clear()
+        body = get_youtube_json("channels", {"id": "UCa"}, access_token="b")
+
+        self.assertEqual(body, {"items": ["public"]})
+        _, kwargs = patched_session.return_value.get.call_args
+        self.assertEqual(kwargs["headers"]["If-None-Match"], '"v1"')
+
+    def test_not_modified_without_cache_entry_refetches(self, patched_session):
+        """Test a 304 for an unknown entry is fetched again unconditionally."""
+        not_modified = MagicMock(status_code=304, headers={})
+        fresh = MagicMock(status_code=200, headers={"ETag": '"v2"'})
+        fresh.json.return_value = {"items": ["fresh"]}
+        patched_session.return_value.get.side_effect = [not_modified, fresh]
+
+        body = get_youtube_json("videos", {"id": "a"})
+
+        self.assertEqual(body, {"items": ["fresh"]})
+        not_modified.json.assert_not_called()
+        _, kwargs = patched_session.return_value.get.call_args
+        self.assertNotIn("If-None-Match", kwargs["headers"])
+
+
+class FieldsMaskTests(SimpleTestCase):
+    """Test partial-response masks stay in sync with the transforms."""
+
+    def test_subscription_mask(self):
+        """Test the subscriptions mask lists every path the transform reads."""
+        self.assertEqual(
+            build_fields_mask(SUBSCRIPTION_ITEM_FIELDS, "nextPageToken"),
+            "etag,nextPageToken,items(snippet/title,snippet/resourceId/channelId,"
+            "snippet/thumbnails/medium/url,snippet/description)",
+        )
+
+    def test_transform_reads_masked_item(self):
+        """Test a response trimmed to the mask is enough for the transform."""
+        item = {
+            "snippet": {
+                "title": "Channel",
+                "resourceId": {"channelId": "UCabc"},
+                "thumbnails": {"medium": {"url": "https://img"}},
+            }
+        }
+
+        transformed, channel_ids = transform_subscriptions([item])
+
+        self.assertEqual(channel_ids, ["UCabc"])
+        self.assertEqual(
+            transformed[0],
+            {
+                "title": "Channel",
+                "channel_id": "UCabc",
+                "uploads_playlist_id": "UUabc",
+                "image_url": "https://img",
+                "description": "",
+            },
+        )
@@ -2,6 +2,7 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
 from subscribe.views.enrich_channels import EnrichChannelsView
+from subscribe.views.feed import FeedView
 from subscribe.views.group import (
     add_subscription_to_group,
     remove_subscription_from_group,
@@ -16,7 +17,11 @@ from subscribe.views.public import (
     GetPublicGroupSubscriptionsView,
     GetPublicGroupInfoViewSet,
 )
-from subscribe.views.subscriptions import SubscriptionsView, SubscriptionsListView
+from subscribe.views.subscriptions import (
+    SubscriptionsView,
+    SubscriptionsListView,
+    SyncJobStatusView,
+)
 
 router = DefaultRouter()
 router.register("groups", GroupViewSet)
@@ -26,6 +31,12 @@ app_name = "subscribe"
 urlpatterns = [
     path("info/", SubscriptionsView.as_view(), name="subscriptions-view"),
     path("list/", SubscriptionsListView.as_view(), name="subscriptions-list-view"),
+    path("feed/", FeedView.as_view(), name="feed"),
+    path(
+        "sync-jobs/<int:job_id>/",
+        SyncJobStatusView.as_view(),
+        name="sync-job-status",
+    ),
     path(
         "groups/<int:group_id>/add-subscription/",
         add_subscription_to_group,
@@ -0,0 +1,101 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from core.models import CachedApiResponse
+
+CachedResponse = namedtuple("CachedResponse", ["etag", "body"])
+
+# Query params that do not change the response and must not split the cache
+IGNORED_PARAMS = frozenset({"key"})
+
+
+def make_cache_key(url, params, scope=None):
+    """
+    Build a stable cache key from the request url, its params and a scope.
+
+    The scope separates responses that depend on who is asking, e.g. ``mine=True``.
+    """
+    normalized = sorted(
+        (name, str(value))
+        for name, value in params.items()
+        if value is not None and name not in IGNORED_PARAMS
+    )
+    raw = json.dumps([url, normalized, scope])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class ETagCache:
+    """
+    Size-bounded LRU of ETags and response bodies with an optional database tier.
+
+    The in-process tier is shared by the fan-out threads, so every access to it
+    goes through a lock. Only entries stored with ``persist=True`` reach the
+    database, so short-lived scopes (e.g. per access token) never pile up there.
+    """
+
+    def __init__(self, max_entries, use_database=False):
+        self.max_entries = max_entries
+        self.use_database = use_database
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, persist=False):
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                return cached
+
+        if not (self.use_database and persist):
+            return None
+
+        row = CachedApiResponse.objects.filter(key=key).first()
+        if row is None:
+            return None
+
+        cached = CachedResponse(row.etag, row.body)
+        self._remember(key, cached)
+        return cached
+
+    def set(self, key, etag, body, persist=False):
+        cached = CachedResponse(etag, body)
+        self._remember(key, cached)
+
+        if self.use_database and persist:
+            CachedApiResponse.objects.update_or_create(
+                key=key, defaults={"etag": etag, "body": body}
+            )
+
+    @contextmanager
+    def memory_only(self):
+        """
+        Skip the database tier for the duration, e.g. while benchmarking.
+        """
+        use_database = self.use_database
+        self.use_database = False
+        try:
+            yield self
+        finally:
+            self.use_database = use_database
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _remember(self, key, cached):
+        with self._lock:
+            self._entries[key] = cached
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+response_cache = ETagCache(
+    max_entries=settings.YOUTUBE_ETAG_CACHE_SIZE,
+    use_database=settings.YOUTUBE_ETAG_CACHE_DATABASE,
+)
@@ -0,0 +1,63 @@
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from core.models import Group, SubscriptionMembership, UserSubscriptionCollection
+
+
+def _count_of(fk_name):
+    counts = (
+        SubscriptionMembership.objects.filter(**{fk_name: OuterRef("pk")})
+        .values(fk_name)
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def group_count_expression():
+    return _count_of("group")
+
+
+def collection_count_expression():
+    return _count_of("collection")
+
+
+def refresh_group_counts(groups):
+    """
+    Recount the subscriptions of ``groups`` (a queryset or ids) in one UPDATE.
+    """
+    return Group.objects.filter(pk__in=groups).update(
+        subscriptions_count=group_count_expression()
+    )
+
+
+def refresh_collection_counts(collections):
+    """
+    Recount the subscriptions of ``collections`` (a queryset or ids) in one UPDATE.
+    """
+    return UserSubscriptionCollection.objects.filter(pk__in=collections).update(
+        subscriptions_count=collection_count_expression()
+    )
+
+
+def reconcile_counts():
+    """
+    Repair counters that drifted from the membership table.
+
+    Returns the number of repaired groups and collections.
+    """
+    drifted_groups = list(
+        Group.objects.alias(actual=group_count_expression())
+        .exclude(subscriptions_count=F("actual"))
+        .values_list("pk", flat=True)
+    )
+    drifted_collections = list(
+        UserSubscriptionCollection.objects.alias(actual=collection_count_expression())
+        .exclude(subscriptions_count=F("actual"))
+        .values_list("pk", flat=True)
+    )
+    if drifted_groups:
+        refresh_group_counts(drifted_groups)
+    if drifted_collections:
+        refresh_collection_counts(drifted_collections)
+    return {"groups": len(drifted_groups), "collections": len(drifted_collections)}
@@ -0,0 +1,280 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, F, Min, OuterRef, Q
+from django.utils import timezone
+
+from core.models import Subscription, Upload
+from core.utils.hashing import content_hash
+from subscribe.utils.history import record_upload_history
+from subscribe.utils.quota import flush_quota_usage, plan_enrichment_batch
+from subscribe.utils.subscriptions import (
+    derive_uploads_playlist_id,
+    get_upload_playlist_ids,
+    get_latest_uploads,
+    get_video_details,
+    transform_video_details,
+)
+
+ENRICH_BATCH_SIZE = 30
+ENRICH_STALE_AFTER = timedelta(weeks=1)
+# Channels that failed or have no uploads wait this long before another attempt
+ENRICH_RETRY_AFTER = timedelta(hours=6)
+
+
+def stale_subscriptions(stale_before=None, collection=None, retry_before=None):
+    """
+    Return channels whose latest upload is missing or older than ``stale_before``.
+
+    Channels are global, so without a ``collection`` every channel followed by at
+    least one user is returned exactly once. Never enriched channels come first,
+    then the stalest ones. Channels attempted after ``retry_before`` are left out,
+    so channels without uploads do not hold the head of the queue.
+    """
+    now = timezone.now()
+    if stale_before is None:
+        stale_before = now - ENRICH_STALE_AFTER
+    if retry_before is None:
+        retry_before = now - ENRICH_RETRY_AFTER
+
+    queryset = Subscription.objects.filter(
+        Q(upload__last_sync__lt=stale_before) | Q(upload__isnull=True),
+        Q(enrichment_attempted_at__lt=retry_before)
+        | Q(enrichment_attempted_at__isnull=True),
+    )
+    if collection is not None:
+        queryset = queryset.filter(users_list=collection)
+    else:
+        followers = Subscription.users_list.through.objects.filter(
+            subscription=OuterRef("pk")
+        )
+        queryset = queryset.filter(Exists(followers))
+
+    return queryset.order_by(F("upload__last_sync").asc(nulls_first=True), "id").only(
+        "id", "channel_id", "uploads_playlist_id"
+    )
+
+
+def resolve_uploads_playlist_ids(access_token, subscriptions):
+    """
+    Return the uploads playlist ids of ``subscriptions`` and persist new ones.
+
+    Ids are derived from the channel id when possible, channels.list is only
+    called for channels that have never been resolved.
+    """
+    resolved = []
+    unresolved = []
+    for subscription in subscriptions:
+        if subscription.uploads_playlist_id:
+            continue
+        subscription.uploads_playlist_id = derive_uploads_playlist_id(
+            subscription.channel_id
+        )
+        if subscription.uploads_playlist_id:
+            resolved.append(subscription)
+        else:
+            unresolved.append(subscription)
+
+    if unresolved:
+        playlist_ids = get_upload_playlist_ids(
+            access_token=access_token,
+            channel_ids=[subscription.channel_id for subscription in unresolved],
+        )
+        for subscription in unresolved:
+            subscription.uploads_playlist_id = playlist_ids.get(subscription.channel_id)
+            if subscription.uploads_playlist_id:
+                resolved.append(subscription)
+
+    if resolved:
+        Subscription.objects.bulk_update(resolved, ["uploads_playlist_id"])
+
+    return [
+        subscription.uploads_playlist_id
+        for subscription in subscriptions
+        if subscription.uploads_playlist_id
+    ]
+
+
+UPLOAD_FIELDS = ["title", "video_url", "video_image_url", "upload_time"]
+
+
+def write_uploads(uploads, synced_at):
+    """
+    Upsert the latest upload of each channel and stamp ``synced_at`` on all.
+
+    Changed and new rows are written with one upsert. Rows whose content hash
+    is unchanged only get their ``last_sync`` bumped, since they were confirmed
+    fresh. New and changed uploads are also appended to the upload history.
+    Returns the number of inserted, updated and unchanged rows.
+    """
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+    if not uploads:
+        return counts
+
+    stored_hashes = dict(
+        Upload.objects.filter(
+            subscription_id__in=[upload.subscription_id for upload in uploads]
+        ).values_list("subscription_id", "content_hash")
+    )
+    changed = []
+    unchanged_ids = []
+    for upload in uploads:
+        upload.last_sync = synced_at
+        upload.content_hash = content_hash(
+            *(getattr(upload, field) for field in UPLOAD_FIELDS)
+        )
+        stored_hash = stored_hashes.get(upload.subscription_id)
+        if stored_hash is None:
+            counts["inserted"] += 1
+            changed.append(upload)
+        elif stored_hash != upload.content_hash:
+            counts["updated"] += 1
+            changed.append(upload)
+        else:
+            counts["unchanged"] += 1
+            unchanged_ids.append(upload.subscription_id)
+
+    if changed:
+        Upload.objects.bulk_create(
+            changed,
+            update_conflicts=True,
+            unique_fields=["subscription"],
+            update_fields=UPLOAD_FIELDS + ["content_hash", "last_sync"],
+        )
+        record_upload_history(changed)
+    if unchanged_ids:
+        Upload.objects.filter(subscription_id__in=unchanged_ids).update(
+            last_sync=synced_at
+        )
+    return counts
+
+
+def enrich_subscriptions(subscriptions, access_token, max_workers=None):
+    """
+    Fetch the latest upload of every subscription and store it.
+
+    Every subscription is marked as attempted, whether it got an upload or not.
+    Returns the write counts of ``write_uploads`` and the
+    ``{playlist_id: error}`` mapping of playlists that failed.
+    """
+    ids_key_values = {
+        subscription.channel_id: subscription.id for subscription in subscriptions
+    }
+
+    subscriptions_playlist_ids = resolve_uploads_playlist_ids(
+        access_token=access_token, subscriptions=subscriptions
+    )
+    latest_videos, failed_playlists = get_latest_uploads(
+        access_token=access_token,
+        playlist_ids=subscriptions_playlist_ids,
+        max_workers=max_workers,
+    )
+    videos_detail = get_video_details(
+        access_token=access_token, video_ids=latest_videos
+    )
+
+    transformed_videos = transform_video_details(videos_detail)
+
+    uploads = {}
+    for video in transformed_videos:
+        subscription_id = ids_key_values.get(video["subscription"])
+
+        if subscription_id:
+            uploads[subscription_id] = Upload(
+                subscription_id=subscription_id,
+                title=video["title"],
+                upload_time=video["upload_time"],
+                video_url=video["video_url"],
+                video_image_url=video["video_image_url"],
+            )
+
+    synced_at = timezone.now()
+    with transaction.atomic():
+        result = write_uploads(list(uploads.values()), synced_at)
+        Subscription.objects.filter(
+            pk__in=[subscription.pk for subscription in subscriptions]
+        ).update(enrichment_attempted_at=synced_at)
+
+    result["failed_playlists"] = failed_playlists
+    return result
+
+
+def enrich_stale_channels(
+    access_token=None,
+    batch_size=ENRICH_BATCH_SIZE,
+    limit=None,
+    stale_before=None,
+    max_workers=None,
+):
+    """
+    Refresh stale channels across all users, each channel once per pass.
+
+    Without an ``access_token`` the calls are made with the server API key.
+    Batches shrink with the remaining quota budget and the pass stops when the
+    budget is spent. Returns the pass statistics.
+    """
+    stats = {
+        "enriched": 0,
+        "skipped": 0,
+        "unchanged": 0,
+        "batches": 0,
+        "deferred": False,
+        "elapsed": 0.0,
+    }
+    pass_started = time.monotonic()
+
+    while limit is None or stats["enriched"] + stats["skipped"] < limit:
+        size = plan_enrichment_batch(
+            batch_size, reserve=settings.YOUTUBE_QUOTA_ENRICHMENT_RESERVE
+        )
+        if not size:
+            stats["deferred"] = True
+            break
+        if limit is not None:
+            size = min(size, limit - stats["enriched"] - stats["skipped"])
+
+        batch = list(stale_subscriptions(stale_before)[:size])
+        if not batch:
+            break
+
+        result = enrich_subscriptions(
+            batch, access_token=access_token, max_workers=max_workers
+        )
+        flush_quota_usage()
+
+        enriched_count = result["inserted"] + result["updated"] + result["unchanged"]
+        stats["enriched"] += enriched_count
+        stats["unchanged"] += result["unchanged"]
+        stats["skipped"] += len(batch) - enriched_count
+        stats["batches"] += 1
+
+    stats["elapsed"] = time.monotonic() - pass_started
+    return stats
+
+
+def enrichment_lag(stale_before=None):
+    """
+    Describe how far behind enrichment is across all followed channels.
+
+    Returns the number of stale and never enriched channels, and the last sync
+    time of the stalest enriched one.
+    """
+    if stale_before is None:
+        stale_before = timezone.now() - ENRICH_STALE_AFTER
+
+    followers = Subscription.users_list.through.objects.filter(
+        subscription=OuterRef("pk")
+    )
+    followed = Subscription.objects.filter(Exists(followers))
+
+    return {
+        "stale": followed.filter(
+            Q(upload__last_sync__lt=stale_before) | Q(upload__isnull=True)
+        ).count(),
+        "never_enriched": followed.filter(upload__isnull=True).count(),
+        "oldest_sync": Upload.objects.filter(subscription__in=followed).aggregate(
+            oldest=Min("last_sync")
+        )["oldest"],
+    }
@@ -0,0 +1,390 @@
+"""
+Local stand-in for the YouTube Data and Google OAuth APIs.
+
+Answers are built from captured API responses (see fake_responses) with
+configurable latency and error injection, so the sync and enrichment pipelines
+can run without credentials. The account behind an access token is picked from
+the token itself: ``fake-token-<size>`` is a synthetic account with ``size``
+subscriptions. Only the fake_google_api and benchmark_pipeline commands and the
+tests use it, the app itself never imports it.
+"""
+
+import copy
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+FAKE_TOKEN_PREFIX = "fake-token-"
+CAPTURED_RESPONSES_DIR = Path(__file__).parent / "fake_responses"
+CAPTURED_RESOURCES = ("subscriptions", "channels", "playlistItems", "videos")
+
+
+def fake_token(account_size):
+    return f"{FAKE_TOKEN_PREFIX}{account_size}"
+
+
+def load_captured_responses(directory):
+    """
+    Load one captured ``<resource>.list`` response per resource.
+
+    A file may also hold a list of responses, e.g. every page of a sync, their
+    items are served together.
+    """
+    responses = {}
+    for resource in CAPTURED_RESOURCES:
+        path = Path(directory) / f"{resource}.json"
+        if not path.exists():
+            continue
+        with open(path) as captured:
+            pages = json.load(captured)
+        if isinstance(pages, dict):
+            pages = [pages]
+        responses[resource] = {
+            **pages[0],
+            "items": [item for page in pages for item in page["items"]],
+        }
+    return responses
+
+
+def make_subscription(template, index):
+    channel_id = f"UCfake{index:016d}"
+    item = copy.deepcopy(template)
+    item["id"] = f"fakesubscription{index:016d}"
+    snippet = item["snippet"]
+    snippet["title"] = f"Fake channel {index}"
+    snippet["description"] = f"Synthetic channel number {index}."
+    snippet["resourceId"]["channelId"] = channel_id
+    for size, thumbnail in snippet["thumbnails"].items():
+        thumbnail["url"] = f"https://example.com/channels/{index}-{size}.jpg"
+    return item
+
+
+def make_video(template, channel_id):
+    video_id = f"fakevideo{channel_id[-8:]}"
+    item = copy.deepcopy(template)
+    item["id"] = video_id
+    snippet = item["snippet"]
+    snippet["channelId"] = channel_id
+    snippet["title"] = f"Latest upload of {channel_id}"
+    snippet["publishedAt"] = "2024-01-01T00:00:00Z"
+    for size, thumbnail in snippet["thumbnails"].items():
+        thumbnail["url"] = f"https://example.com/videos/{video_id}-{size}.jpg"
+    return item
+
+
+def subscribed_channel_id(item):
+    return item["snippet"]["resourceId"]["channelId"]
+
+
+class FakeGoogleData:
+    """
+    Subscriptions and latest uploads shared by every fake account.
+
+    The bundled captures only provide the shape of each answer, synthetic
+    accounts clone their items. A directory of captures from a real account is
+    served as recorded, with a cloned upload for channels it has none for.
+    """
+
+    def __init__(self, fixture_path=None):
+        self._lock = threading.Lock()
+        self._accounts = {}
+        self._channels = {}
+        self._videos = {}
+        self._recorded = None
+
+        self.captured = load_captured_responses(CAPTURED_RESPONSES_DIR)
+        if fixture_path:
+            recorded = load_captured_responses(fixture_path)
+            self.captured.update(recorded)
+            self._recorded = recorded["subscriptions"]["items"]
+            for video in recorded.get("videos", {}).get("items", []):
+                self._videos[video["id"]] = video
+            self._register(self._recorded)
+
+    def template(self, resource):
+        return self.captured[resource]["items"][0]
+
+    def account(self, size):
+        """
+        Return the subscription items of an account with ``size`` channels.
+
+        Recorded subscriptions are served as is, truncated to ``size``.
+        """
+        if self._recorded is not None:
+            return self._recorded[:size]
+
+        with self._lock:
+            if size not in self._accounts:
+                template = self.template("subscriptions")
+                items = [make_subscription(template, index) for index in range(size)]
+                self._register(items)
+                self._accounts[size] = items
+            return self._accounts[size]
+
+    def channel(self, channel_id):
+        return self._channels.get(channel_id)
+
+    def latest_video(self, channel_id):
+        return self._videos.get(self._channels[channel_id])
+
+    def video(self, video_id):
+        return self._videos.get(video_id)
+
+    def _register(self, items):
+        uploads = {
+            video["snippet"]["channelId"]: video["id"]
+            for video in self._videos.values()
+        }
+        for item in items:
+            channel_id = subscribed_channel_id(item)
+            if channel_id not in uploads:
+                video = make_video(self.template("videos"), channel_id)
+                self._videos[video["id"]] = video
+                uploads[channel_id] = video["id"]
+            self._channels[channel_id] = uploads[channel_id]
+
+
+class FakeGoogleRequestHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def _handle(self, method):
+        fake = self.server.fake
+        url = urlparse(self.path)
+        params = {name: values[0] for name, values in parse_qs(url.query).items()}
+        fake.record(url.path)
+        fake.delay()
+
+        error_status = fake.injected_error()
+        if error_status:
+            return self._send_error(error_status)
+
+        routes = {
+            ("GET", "/youtube/v3/subscriptions"): self._subscriptions,
+            ("GET", "/youtube/v3/channels"): self._channels,
+            ("GET", "/youtube/v3/playlistItems"): self._playlist_items,
+            ("GET", "/youtube/v3/videos"): self._videos,
+            ("GET", "/oauth2/v3/userinfo"): self._user_info,
+            ("POST", "/token"): self._token,
+        }
+        route = routes.get((method, url.path))
+        if route is None:
+            return self._send_json(404, {"error": {"code": 404, "errors": []}})
+
+        body = route(params)
+        etag = f'"{hashlib.sha1(json.dumps(body).encode()).hexdigest()}"'
+        if method == "GET" and self.headers.get("If-None-Match") == etag:
+            fake.record("not_modified")
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return None
+
+        body["etag"] = etag
+        return self._send_json(200, body, etag=etag)
+
+    def _account_size(self):
+        authorization = self.headers.get("Authorization", "")
+        token = authorization.removeprefix("Bearer ")
+        if token.startswith(FAKE_TOKEN_PREFIX):
+            return int(token[len(FAKE_TOKEN_PREFIX) :])
+        return self.server.fake.default_account_size
+
+    def _subscriptions(self, params):
+        fake = self.server.fake
+        items = fake.data.account(self._account_size())
+        offset = int(params.get("pageToken") or 0)
+        limit = min(int(params.get("maxResults", 5)), 50)
+
+        body = self._envelope("subscriptions", items[offset : offset + limit])
+        body["pageInfo"] = {"totalResults": len(items), "resultsPerPage": limit}
+        if offset + limit < len(items):
+            body["nextPageToken"] = str(offset + limit)
+        return body
+
+    def _channels(self, params):
+        data = self.server.fake.data
+        items = []
+        for channel_id in params.get("id", "").split(","):
+            if data.channel(channel_id):
+                item = copy.deepcopy(data.template("channels"))
+                item["id"] = channel_id
+                playlists = item["contentDetails"]["relatedPlaylists"]
+                playlists["uploads"] = f"UU{channel_id[2:]}"
+                items.append(item)
+        return self._envelope("channels", items)
+
+    def _playlist_items(self, params):
+        data = self.server.fake.data
+        playlist_id = params.get("playlistId", "")
+        channel_id = f"UC{playlist_id[2:]}"
+        if not data.channel(channel_id):
+            return self._envelope("playlistItems", [])
+
+        video = data.latest_video(channel_id)
+        item = copy.deepcopy(data.template("playlistItems"))
+        snippet = item["snippet"]
+        snippet.update(
+            {
+                key: copy.deepcopy(video["snippet"][key])
+                for key in ("publishedAt", "channelId", "title", "thumbnails")
+            }
+        )
+        snippet["playlistId"] = playlist_id
+        snippet["resourceId"]["videoId"] = video["id"]
+        return self._envelope("playlistItems", [item])
+
+    def _videos(self, params):
+        data = self.server.fake.data
+        items = [
+            data.video(video_id)
+            for video_id in params.get("id", "").split(",")
+            if data.video(video_id)
+        ]
+        return self._envelope("videos", items)
+
+    def _envelope(self, resource, items):
+        captured = self.server.fake.data.captured[resource]
+        return {"kind": captured["kind"], "items": items}
+
+    def _user_info(self, params):
+        return {
+            "email": "fake.user@example.com",
+            "given_name": "Fake",
+            "family_name": "User",
+            "picture": "https://example.com/users/fake.jpg",
+        }
+
+    def _token(self, params):
+        return {
+            "access_token": fake_token(self.server.fake.default_account_size),
+            "refresh_token": "fake-refresh-token",
+        }
+
+    def _send_error(self, status):
+        reason = "quotaExceeded" if status == 403 else "backendError"
+        return self._send_json(
+            status, {"error": {"code": status, "errors": [{"reason": reason}]}}
+        )
+
+    def _send_json(self, status, body, etag=None):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class FakeGoogleHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops connections from wide fan-outs
+    request_queue_size = 128
+
+
+class FakeGoogleServer:
+    """
+    Threaded HTTP server serving the fake Google APIs.
+
+    Use it as a context manager, then point YOUTUBE_API_BASE_URL,
+    GOOGLE_OAUTH2_TOKEN_URL and GOOGLE_USER_INFO_URL at ``youtube_url``,
+    ``token_url`` and ``user_info_url``.
+    """
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        latency_ms=0,
+        jitter_ms=0,
+        error_rate=0.0,
+        error_status=503,
+        default_account_size=100,
+        fixture_path=None,
+        seed=None,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.default_account_size = default_account_size
+        self.data = FakeGoogleData(fixture_path=fixture_path)
+        self.stats = Counter()
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._httpd = FakeGoogleHTTPServer((host, port), FakeGoogleRequestHandler)
+        self._httpd.fake = self
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def youtube_url(self):
+        return f"{self.url}/youtube/v3"
+
+    @property
+    def token_url(self):
+        return f"{self.url}/token"
+
+    @property
+    def user_info_url(self):
+        return f"{self.url}/oauth2/v3/userinfo"
+
+    def record(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def delay(self):
+        if not (self.latency_ms or self.jitter_ms):
+            return
+        with self._lock:
+            jitter = self._random.uniform(0, self.jitter_ms)
+        time.sleep((self.latency_ms + jitter) / 1000)
+
+    def injected_error(self):
+        if not self.error_rate:
+            return None
+        with self._lock:
+            failed = self._random.random() < self.error_rate
+        if failed:
+            self.record("injected_errors")
+            return self.error_status
+        return None
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
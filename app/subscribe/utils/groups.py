@@ -0,0 +1,31 @@
+from django.db import transaction
+
+from core.models import SubscriptionMembership
+from subscribe.utils.counters import refresh_group_counts
+
+
+def move_to_group(user_subscription_list, subscription_ids, group=None):
+    """
+    Put the user's ``subscription_ids`` in ``group``, or in no group at all.
+
+    The group is a column of the membership row, so the move is one UPDATE
+    whatever group the subscriptions were in before, and a subscription can
+    never end up in two groups of the same user. Returns the number of moved
+    subscriptions, those already in ``group`` are left alone.
+    """
+    memberships = SubscriptionMembership.objects.filter(
+        collection=user_subscription_list, subscription_id__in=subscription_ids
+    ).exclude(group=group)
+
+    with transaction.atomic():
+        touched_groups = set(
+            memberships.exclude(group=None).values_list("group_id", flat=True)
+        )
+        moved = memberships.update(group=group)
+        if group is not None:
+            touched_groups.add(group.pk)
+        # Bulk updates bypass the m2m signals that maintain the counters
+        if moved and touched_groups:
+            refresh_group_counts(touched_groups)
+
+    return moved
@@ -0,0 +1,146 @@
+import re
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from core.models import UploadHistory
+
+HISTORY_TABLE = UploadHistory._meta.db_table
+PARTITION_NAME_RE = re.compile(rf"^{HISTORY_TABLE}_p(\d{{4}})_(\d{{2}})$")
+
+
+def month_start(value):
+    return value.astimezone(dt_timezone.utc).replace(
+        day=1, hour=0, minute=0, second=0, microsecond=0
+    )
+
+
+def add_months(start, months):
+    index = start.year * 12 + start.month - 1 + months
+    return start.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(start):
+    return f"{HISTORY_TABLE}_p{start:%Y_%m}"
+
+
+def retention_cutoff(months=None):
+    """
+    Return the start of the oldest month kept in the history.
+    """
+    if months is None:
+        months = settings.UPLOAD_HISTORY_RETENTION_MONTHS
+    return add_months(month_start(timezone.now()), -months)
+
+
+def ensure_partitions(months):
+    """
+    Create the monthly partitions of ``months`` that do not exist yet.
+
+    Nothing is remembered between calls: the creation may still be rolled back
+    with the caller's transaction, and a batch rarely spans more than a couple
+    of months, so checking the catalog every time costs little.
+    """
+    with connection.cursor() as cursor:
+        for start in sorted(set(months)):
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {partition_name(start)} "
+                f"PARTITION OF {HISTORY_TABLE} FOR VALUES FROM (%s) TO (%s)",
+                [start, add_months(start, 1)],
+            )
+
+
+def record_upload_history(uploads):
+    """
+    Append new uploads to the history, ignoring the ones already recorded.
+
+    Uploads older than the retention window are not recorded, they would be
+    dropped by the next retention run anyway.
+    """
+    cutoff = retention_cutoff()
+    history = [
+        UploadHistory(
+            subscription_id=upload.subscription_id,
+            title=upload.title,
+            video_url=upload.video_url,
+            video_image_url=upload.video_image_url,
+            upload_time=upload.upload_time,
+        )
+        for upload in uploads
+        if upload.upload_time >= cutoff
+    ]
+    if not history:
+        return 0
+
+    ensure_partitions({month_start(entry.upload_time) for entry in history})
+    UploadHistory.objects.bulk_create(history, ignore_conflicts=True)
+    return len(history)
+
+
+def drop_expired_history(cutoff=None):
+    """
+    Remove the history of the months before ``cutoff``.
+
+    Whole partitions are dropped, which leaves no dead rows behind.
+    Returns the number of dropped partitions.
+    """
+    cutoff = month_start(cutoff) if cutoff else retention_cutoff()
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "WHERE parent.relname = %s",
+            [HISTORY_TABLE],
+        )
+        partitions = [row[0] for row in cursor.fetchall()]
+
+        dropped = 0
+        for name in partitions:
+            match = PARTITION_NAME_RE.match(name)
+            if not match:
+                continue
+            start = cutoff.replace(year=int(match[1]), month=int(match[2]))
+            if add_months(start, 1) <= cutoff:
+                cursor.execute(f"DROP TABLE {name}")
+                dropped += 1
+    return dropped
+
+
+def trim_upload_history(keep=None, since=None):
+    """
+    Keep only the ``keep`` newest uploads of the channels active since ``since``.
+
+    A channel only grows past ``keep`` when new uploads are recorded, and those
+    land in the newest partitions, so the candidates are found there. It
+    defaults to the start of the previous month. The rest of each candidate's
+    history is read through its ``(subscription, upload_time)`` index, older
+    channels are left to ``drop_expired_history``.
+    Rows are matched on the whole primary key, ``(id, upload_time)``.
+    Returns the number of deleted rows.
+    """
+    if keep is None:
+        keep = settings.UPLOAD_HISTORY_PER_CHANNEL
+    if since is None:
+        since = add_months(month_start(timezone.now()), -1)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {HISTORY_TABLE} history USING ("
+            "    SELECT expired.id, expired.upload_time FROM ("
+            f"        SELECT DISTINCT subscription_id FROM {HISTORY_TABLE}"
+            "        WHERE upload_time >= %s"
+            "    ) recent CROSS JOIN LATERAL ("
+            f"        SELECT id, upload_time FROM {HISTORY_TABLE}"
+            "        WHERE subscription_id = recent.subscription_id"
+            "        ORDER BY upload_time DESC, id DESC OFFSET %s"
+            "    ) expired"
+            ") expired "
+            "WHERE history.id = expired.id "
+            "AND history.upload_time = expired.upload_time",
+            [since, keep],
+        )
+        return cursor.rowcount
@@ -0,0 +1,157 @@
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import SyncJob
+from subscribe.utils.quota import flush_quota_usage
+from subscribe.utils.sync import sync_collection_once
+
+# A running job older than this is assumed to belong to a dead worker
+SYNC_JOB_TIMEOUT = timedelta(minutes=30)
+
+
+def _waiting_jobs():
+    """
+    Return the jobs no worker is running, queued or left by a dead worker.
+    """
+    return SyncJob.objects.filter(
+        Q(status=SyncJob.STATUS_QUEUED)
+        | Q(
+            status=SyncJob.STATUS_RUNNING,
+            started_at__lt=timezone.now() - SYNC_JOB_TIMEOUT,
+        )
+    )
+
+
+def enqueue_sync_job(user_subscription_list, access_token):
+    """
+    Queue a sync of the user's subscriptions, reusing a pending job if any.
+
+    A collection has at most one queued or running job. The unique constraint
+    settles concurrent requests, the one that loses reuses the winner's job.
+    """
+    pending = SyncJob.objects.filter(
+        collection=user_subscription_list,
+        status__in=[SyncJob.STATUS_QUEUED, SyncJob.STATUS_RUNNING],
+    )
+    while True:
+        job = pending.first()
+        if job is not None:
+            break
+        try:
+            with transaction.atomic():
+                return SyncJob.objects.create(
+                    collection=user_subscription_list, access_token=access_token
+                )
+        except IntegrityError:
+            continue
+
+    # The newest token is the one least likely to expire before the run
+    _waiting_jobs().filter(pk=job.pk).update(access_token=access_token)
+    return job
+
+
+def claim_sync_job():
+    """
+    Lock the oldest runnable job and mark it as running.
+
+    ``SKIP LOCKED`` lets several workers poll the queue without waiting on each
+    other. The access token is cleared from the row once claimed, only the
+    worker keeps it in memory. Jobs left running by a dead worker are claimed
+    again after SYNC_JOB_TIMEOUT if a new request gave them a token, otherwise
+    they are failed. Returns None when the queue is empty.
+    """
+    now = timezone.now()
+    while True:
+        with transaction.atomic():
+            job = (
+                SyncJob.objects.select_for_update(skip_locked=True)
+                .filter(
+                    Q(status=SyncJob.STATUS_QUEUED)
+                    | Q(
+                        status=SyncJob.STATUS_RUNNING,
+                        started_at__lt=now - SYNC_JOB_TIMEOUT,
+                    )
+                )
+                .order_by("created_at")
+                .first()
+            )
+            if job is None:
+                return None
+
+            if not job.access_token:
+                job.status = SyncJob.STATUS_FAILED
+                job.error = "The worker stopped, request a new sync."
+                job.finished_at = now
+                job.save(update_fields=["status", "error", "finished_at"])
+                continue
+
+            access_token = job.access_token
+            job.status = SyncJob.STATUS_RUNNING
+            job.started_at = now
+            job.access_token = ""
+            job.save(update_fields=["status", "started_at", "access_token"])
+        job.access_token = access_token
+        return job
+
+
+def run_sync_job(job):
+    """
+    Run a claimed job and store its outcome.
+    """
+    collection = job.collection
+
+    def report_progress(synced_count):
+        SyncJob.objects.filter(pk=job.pk).update(progress=synced_count)
+
+    try:
+        stats = sync_collection_once(
+            user_subscription_list=collection,
+            access_token=job.access_token,
+            requested_at=job.created_at,
+            on_progress=report_progress,
+        )
+
+        job.status = SyncJob.STATUS_SUCCEEDED
+        job.result = {
+            "subscriptions_count": collection.subscriptions_count,
+            "last_sync_date": collection.last_data_sync.isoformat(),
+            "is_shared": stats is None,
+        }
+        if stats is not None:
+            job.progress = stats["synced"]
+            job.result.update(
+                removed=stats["removed"],
+                ungrouped=stats["ungrouped"],
+                writes_avoided=stats["writes_avoided"],
+            )
+        update_fields = ["status", "progress", "result"]
+    except Exception as e:
+        job.status = SyncJob.STATUS_FAILED
+        job.error = str(e)
+        # Keep the progress the sync reported, the instance never saw it
+        update_fields = ["status", "error"]
+    finally:
+        flush_quota_usage()
+
+    job.access_token = ""
+    job.finished_at = timezone.now()
+    job.save(update_fields=[*update_fields, "access_token", "finished_at"])
+    return job
+
+
+def process_sync_jobs(max_jobs=None):
+    """
+    Run queued jobs until the queue is empty or ``max_jobs`` were processed.
+
+    Returns the processed jobs.
+    """
+    processed = []
+    while max_jobs is None or len(processed) < max_jobs:
+        job = claim_sync_job()
+        if job is None:
+            break
+        processed.append(run_sync_job(job))
+    return processed
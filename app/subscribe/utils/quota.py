@@ -0,0 +1,173 @@
+import math
+import threading
+from collections import Counter
+from zoneinfo import ZoneInfo
+
+import requests
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from core.models import ApiQuotaUsage
+
+# YouTube Data API unit cost per call type (a 304 answer costs nothing)
+QUOTA_COSTS = {
+    "subscriptions.list": 1,
+    "channels.list": 1,
+    "playlistItems.list": 1,
+    "videos.list": 1,
+}
+QUOTA_EXCEEDED_CALL_TYPE = "quotaExceeded"
+# The daily quota resets at midnight Pacific Time
+QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+
+_pending_units = Counter()
+_pending_calls = Counter()
+_exhausted_day = None
+_lock = threading.Lock()
+
+
+class QuotaExceededError(requests.exceptions.RequestException):
+    pass
+
+
+def quota_day():
+    return timezone.now().astimezone(QUOTA_TIMEZONE).date()
+
+
+def charge_quota(call_type, units=None):
+    """
+    Record a call in the in-process ledger, flushed by ``flush_quota_usage``.
+
+    Charging only touches memory so it is safe from the fan-out threads.
+    """
+    if call_type is None:
+        return
+    if units is None:
+        units = QUOTA_COSTS.get(call_type, 1)
+
+    key = (quota_day(), call_type)
+    with _lock:
+        _pending_units[key] += units
+        _pending_calls[key] += 1
+
+
+def flush_quota_usage():
+    """
+    Write the pending usage to the ApiQuotaUsage ledger.
+    """
+    with _lock:
+        pending = [
+            (key, _pending_units[key], _pending_calls[key]) for key in _pending_calls
+        ]
+        _pending_units.clear()
+        _pending_calls.clear()
+
+    if not pending:
+        return
+
+    ApiQuotaUsage.objects.bulk_create(
+        [
+            ApiQuotaUsage(date=day, call_type=call_type)
+            for (day, call_type), _, _ in pending
+        ],
+        ignore_conflicts=True,
+    )
+    for (day, call_type), units, calls in pending:
+        ApiQuotaUsage.objects.filter(date=day, call_type=call_type).update(
+            units=F("units") + units, calls=F("calls") + calls
+        )
+
+
+def remaining_quota():
+    """
+    Return the units left today across every process sharing the ledger.
+    """
+    if is_quota_exhausted():
+        return 0
+
+    day = quota_day()
+
+    usage = dict(
+        ApiQuotaUsage.objects.filter(date=day).values_list("call_type", "units")
+    )
+    if QUOTA_EXCEEDED_CALL_TYPE in usage:
+        return 0
+
+    with _lock:
+        pending = sum(
+            units
+            for (pending_day, _), units in _pending_units.items()
+            if pending_day == day
+        )
+    return max(0, settings.YOUTUBE_DAILY_QUOTA - sum(usage.values()) - pending)
+
+
+def is_quota_exhausted():
+    return _exhausted_day == quota_day()
+
+
+def is_quota_exceeded_response(response):
+    if response.status_code != 403:
+        return False
+    try:
+        errors = response.json()["error"]["errors"]
+    except (ValueError, KeyError, TypeError):
+        return False
+    return any(
+        error.get("reason") in ("quotaExceeded", "dailyLimitExceeded")
+        for error in errors
+    )
+
+
+def mark_quota_exhausted():
+    """
+    Stop calling the API for the rest of the quota day.
+
+    A marker row is charged to the ledger so other processes stop as well after
+    the next flush. Nothing here touches the database, the fan-out threads may
+    call it.
+    """
+    global _exhausted_day
+
+    _exhausted_day = quota_day()
+    charge_quota(QUOTA_EXCEEDED_CALL_TYPE, units=0)
+
+
+def can_afford(units, reserve=0):
+    return remaining_quota() - reserve >= units
+
+
+def plan_batch_size(requested, unit_cost=1, fixed_cost=0, reserve=0):
+    """
+    Shrink a batch of ``requested`` items so it fits in the remaining budget.
+
+    Returns 0 when the work should be deferred to a later quota day.
+    """
+    available = remaining_quota() - reserve - fixed_cost
+    if available <= 0:
+        return 0
+    return min(requested, available // unit_cost)
+
+
+def estimate_sync_cost(subscriptions_count):
+    # subscriptions.list returns 50 channels per page
+    return max(1, math.ceil(subscriptions_count / 50))
+
+
+def estimate_enrichment_cost(channels_count):
+    # One playlistItems call per channel, plus videos.list and, for playlists
+    # that cannot be derived, channels.list calls of 50 ids each
+    return channels_count + 2 * math.ceil(channels_count / 50)
+
+
+def plan_enrichment_batch(requested, reserve=0):
+    """
+    Return the largest enrichment batch up to ``requested`` that fits in the
+    remaining budget, 0 when it should be deferred to a later quota day.
+    """
+    available = remaining_quota() - reserve
+    size = max(0, min(requested, available))
+    while size and estimate_enrichment_cost(size) > available:
+        size -= 1
+    return size
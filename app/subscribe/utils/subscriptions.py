@@ -1,101 +1,276 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 import requests
 from django.utils import timezone
 from django.conf import settings
+from django.db import connections
 
-YOUTUBE_SUBSCRIPTIONS_URL = "https://www.googleapis.com/youtube/v3/subscriptions"
-YOUTUBE_CHANNELS_URL = "https://www.googleapis.com/youtube/v3/channels"
-YOUTUBE_PLAYLIST_URL = "https://www.googleapis.com/youtube/v3/playlistItems"
-YOUTUBE_VIDEOS_URL = "https://www.googleapis.com/youtube/v3/videos"
+from core.utils.http import get_google_session
+from subscribe.utils.cache import make_cache_key, response_cache
+from subscribe.utils.quota import (
+    QuotaExceededError,
+    charge_quota,
+    is_quota_exceeded_response,
+    is_quota_exhausted,
+    mark_quota_exhausted,
+)
 
+# YouTube Data API resources, resolved against settings.YOUTUBE_API_BASE_URL
+YOUTUBE_SUBSCRIPTIONS = "subscriptions"
+YOUTUBE_CHANNELS = "channels"
+YOUTUBE_PLAYLIST_ITEMS = "playlistItems"
+YOUTUBE_VIDEOS = "videos"
+# Largest page subscriptions.list serves
+SUBSCRIPTIONS_PAGE_SIZE = 50
+# Params that make an answer depend on who asks. Without them a resource (e.g.
+# channels, playlistItems or videos by id) is the same for every caller.
+CALLER_PARAMS = ("mine", "myRating", "mySubscribers")
 
-def get_youtube_subscriptions(access_token):
-    subscriptions = []
+# Item paths read by the fetchers and transforms below. The ``fields`` masks sent
+# to YouTube are built from the same mappings, so reading a new key only needs
+# an entry here.
+SUBSCRIPTION_ITEM_FIELDS = {
+    "title": "snippet/title",
+    "channel_id": "snippet/resourceId/channelId",
+    "image_url": "snippet/thumbnails/medium/url",
+    "description": "snippet/description",
+}
+CHANNEL_ITEM_FIELDS = {
+    "channel_id": "id",
+    "uploads_playlist_id": "contentDetails/relatedPlaylists/uploads",
+}
+PLAYLIST_ITEM_FIELDS = {
+    "video_id": "snippet/resourceId/videoId",
+}
+VIDEO_ITEM_FIELDS = {
+    "video_id": "id",
+    "channel_id": "snippet/channelId",
+    "title": "snippet/title",
+    "image_url": "snippet/thumbnails/medium/url",
+    "published_at": "snippet/publishedAt",
+}
+
+
+def build_fields_mask(item_fields, *top_level):
+    """
+    Build a partial-response ``fields`` mask, e.g. ``etag,items(id,snippet/title)``.
+    """
+    return ",".join(["etag", *top_level, f"items({','.join(item_fields.values())})"])
+
+
+def get_path(item, path, default=None):
+    value = item
+    for key in path.split("/"):
+        if not isinstance(value, dict) or key not in value:
+            return default
+        value = value[key]
+    return value
+
+
+def pluck(item, item_fields, default=None):
+    return {name: get_path(item, path, default) for name, path in item_fields.items()}
+
+
+def get_youtube_json(resource, params, access_token=None, cache_scope=None):
+    """
+    GET (list) a YouTube Data API resource through the ETag cache.
+
+    A cached ETag is sent as ``If-None-Match`` and a 304 answer, which costs no
+    quota, returns the cached body. Public answers are cached for every caller.
+    Answers that depend on the caller (see CALLER_PARAMS) are keyed by
+    ``cache_scope``, or by the access token when no scope is given. Tokens
+    expire within the hour, so only token-keyed answers stay out of the
+    database tier.
+
+    Every call is charged to the quota ledger. Once YouTube answers
+    ``quotaExceeded`` no further calls are made until the quota day rolls over.
+    """
+    url = f"{settings.YOUTUBE_API_BASE_URL}/{resource}"
+    headers = {}
+    scope = cache_scope
+    if access_token:
+        headers["Authorization"] = f"Bearer {access_token}"
+    caller_dependent = any(params.get(name) for name in CALLER_PARAMS)
+    if scope is None and caller_dependent and access_token:
+        scope = f"token:{access_token}"
+    persist = scope is None or not scope.startswith("token:")
+
+    key = make_cache_key(url, params, scope)
+    cached = response_cache.get(key, persist=persist)
+    if cached:
+        headers["If-None-Match"] = cached.etag
+
+    if is_quota_exhausted():
+        raise QuotaExceededError("The daily YouTube API quota is exhausted.")
+
+    call_type = f"{resource}.list"
+    response = get_google_session().get(url, params=params, headers=headers)
+    if response.status_code == 304:
+        charge_quota(call_type, units=0)
+        if cached:
+            return cached.body
+        # Nothing to reuse, a 304 without a body is only useful with an entry
+        headers.pop("If-None-Match", None)
+        headers["Cache-Control"] = "no-cache"
+        response = get_google_session().get(url, params=params, headers=headers)
+        if response.status_code == 304:
+            raise requests.HTTPError(
+                "Not Modified without a cached response", response=response
+            )
+
+    charge_quota(call_type)
+    if is_quota_exceeded_response(response):
+        mark_quota_exhausted()
+    response.raise_for_status()
+
+    body = response.json()
+    etag = response.headers.get("ETag") or body.get("etag")
+    if etag:
+        response_cache.set(key, etag, body, persist=persist)
+    return body
+
+
+def iter_youtube_subscription_pages(access_token, cache_scope=None):
+    """
+    Yield the raw items of each subscriptions page as soon as it arrives.
+    """
     page_token = None
 
     while True:
         params = {
-            "part": "snippet,contentDetails",
+            "part": "snippet",
+            "fields": build_fields_mask(SUBSCRIPTION_ITEM_FIELDS, "nextPageToken"),
             "mine": True,
             "key": settings.GOOGLE_API_KEY,
-            "maxResults": 50,
+            "maxResults": SUBSCRIPTIONS_PAGE_SIZE,
             "pageToken": page_token,
         }
-        headers = {"Authorization": f"Bearer {access_token}"}
 
         try:
-            response = requests.get(
-                YOUTUBE_SUBSCRIPTIONS_URL, params=params, headers=headers
+            data = get_youtube_json(
+                YOUTUBE_SUBSCRIPTIONS,
+                params=params,
+                access_token=access_token,
+                cache_scope=cache_scope,
             )
-            response.raise_for_status()
-            data = response.json()
-            subscriptions.extend(data.get("items", []))
-            page_token = data.get("nextPageToken")
-            if not page_token:
-                break  # Exit the loop if there are no more pages
         except requests.exceptions.RequestException as e:
             raise RuntimeError(f"Failed to retrieve subscriptions: {e}")
 
+        yield data.get("items", [])
+        page_token = data.get("nextPageToken")
+        if not page_token:
+            break  # Exit the loop if there are no more pages
+
+
+def get_youtube_subscriptions(access_token, cache_scope=None):
+    subscriptions = []
+    for page in iter_youtube_subscription_pages(access_token, cache_scope):
+        subscriptions.extend(page)
     return subscriptions
 
 
+def derive_uploads_playlist_id(channel_id):
+    """
+    Derive a channel's uploads playlist id without calling the API.
+
+    Uploads playlists share the channel id with the "UC" prefix swapped to "UU".
+    """
+    if channel_id and channel_id.startswith("UC"):
+        return f"UU{channel_id[2:]}"
+    return None
+
+
 def get_upload_playlist_ids(access_token, channel_ids):
-    playlist_ids = []
+    """
+    Resolve uploads playlist ids with channels.list, keyed by channel id.
+    """
+    playlist_ids = {}
     for i in range(0, len(channel_ids), 50):
         params = {
             "part": "contentDetails",
+            "fields": build_fields_mask(CHANNEL_ITEM_FIELDS),
             "key": settings.GOOGLE_API_KEY,
             "id": [],
         }
-        headers = {"Authorization": f"Bearer {access_token}"}
         chunk = channel_ids[i : i + 50]
         params["id"] = ",".join(chunk)
         try:
-            response = requests.get(
-                url=YOUTUBE_CHANNELS_URL, params=params, headers=headers
+            channel_response = get_youtube_json(
+                YOUTUBE_CHANNELS, params=params, access_token=access_token
             )
-            response.raise_for_status()
-            channel_response = response.json()
-
-            for item in channel_response["items"]:
-                uploads_playlist_id = item["contentDetails"]["relatedPlaylists"][
-                    "uploads"
-                ]
-                playlist_ids.append(uploads_playlist_id)
+
+            for item in channel_response.get("items", []):
+                channel = pluck(item, CHANNEL_ITEM_FIELDS)
+                if channel["uploads_playlist_id"]:
+                    playlist_ids[channel["channel_id"]] = channel["uploads_playlist_id"]
         except requests.exceptions.RequestException as e:
             raise RuntimeError(f"Failed to retrieve playlist_ids: {e}")
 
     return playlist_ids
 
 
-def get_latest_uploads(access_token, playlist_ids):
+def get_playlist_latest_video(access_token, playlist_id):
+    params = {
+        "part": "snippet",
+        "fields": build_fields_mask(PLAYLIST_ITEM_FIELDS),
+        "key": settings.GOOGLE_API_KEY,
+        "maxResults": 1,
+        "playlistId": playlist_id,
+    }
+    playlist_response = get_youtube_json(
+        YOUTUBE_PLAYLIST_ITEMS, params=params, access_token=access_token
+    )
+    if not playlist_response.get("items"):
+        return None
+    return pluck(playlist_response["items"][0], PLAYLIST_ITEM_FIELDS)["video_id"]
+
+
+def run_in_worker_thread(func, *args):
+    """
+    Run ``func`` and close the database connections the worker thread opened.
+
+    Anonymous responses go through the database tier of the ETag cache, and
+    Django opens one connection per thread.
+    """
+    try:
+        return func(*args)
+    finally:
+        connections.close_all()
+
+
+def get_latest_uploads(access_token, playlist_ids, max_workers=None):
+    """
+    Fetch the latest video id of every playlist using a bounded thread pool.
+
+    Video ids keep the order of ``playlist_ids``. A failing playlist does not abort
+    the batch, it is reported in the returned ``{playlist_id: error}`` mapping.
+    """
     latest_videos = []
-    for i in range(0, len(playlist_ids), 50):  # Process in batches of 50
-        chunk = playlist_ids[i : i + 50]
-        for playlist_id in chunk:
+    errors = {}
+    if not playlist_ids:
+        return latest_videos, errors
+
+    max_workers = max_workers or settings.YOUTUBE_FETCH_CONCURRENCY
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(playlist_ids))) as pool:
+        futures = [
+            pool.submit(
+                run_in_worker_thread,
+                get_playlist_latest_video,
+                access_token,
+                playlist_id,
+            )
+            for playlist_id in playlist_ids
+        ]
+        for playlist_id, future in zip(playlist_ids, futures):
             try:
-                params = {
-                    "part": "snippet",
-                    "key": settings.GOOGLE_API_KEY,
-                    "maxResults": 1,
-                    "playlistId": playlist_id,
-                }
-                headers = {"Authorization": f"Bearer {access_token}"}
-                response = requests.get(
-                    url=YOUTUBE_PLAYLIST_URL, params=params, headers=headers
-                )
-                response.raise_for_status()
-                playlist_response = response.json()
-                if playlist_response["items"]:
-                    latest_videos.append(
-                        playlist_response["items"][0]["snippet"]["resourceId"][
-                            "videoId"
-                        ]
-                    )
-            except requests.exceptions.RequestException as e:
-                raise RuntimeError(f"Failed to retrieve get_latest_uploads: {e}")
-    return latest_videos
+                video_id = future.result()
+            except (requests.exceptions.RequestException, KeyError, ValueError) as e:
+                errors[playlist_id] = str(e)
+                continue
+            if video_id:
+                latest_videos.append(video_id)
+    return latest_videos, errors
 
 
 def get_video_details(access_token, video_ids):
@@ -103,16 +278,14 @@ def get_video_details(access_token, video_ids):
     for i in range(0, len(video_ids), 50):  # Process in batches of 50
         params = {
             "part": "snippet",
+            "fields": build_fields_mask(VIDEO_ITEM_FIELDS),
             "key": settings.GOOGLE_API_KEY,
             "id": ",".join(video_ids[i : i + 50]),
         }
-        headers = {"Authorization": f"Bearer {access_token}"}
         try:
-            response = requests.get(
-                url=YOUTUBE_VIDEOS_URL, params=params, headers=headers
+            video_response = get_youtube_json(
+                YOUTUBE_VIDEOS, params=params, access_token=access_token
             )
-            response.raise_for_status()
-            video_response = response.json()
             video_details.extend(video_response["items"])
         except requests.exceptions.RequestException as e:
             raise RuntimeError(f"Failed to retrieve video details: {e}")
@@ -123,16 +296,16 @@ def transform_video_details(video_details):
     transformed = []
 
     for video in video_details:
-        upload_time_str = video["snippet"]["publishedAt"]
-        naive_dt = datetime.strptime(upload_time_str, "%Y-%m-%dT%H:%M:%SZ")
+        fields = pluck(video, VIDEO_ITEM_FIELDS)
+        naive_dt = datetime.strptime(fields["published_at"], "%Y-%m-%dT%H:%M:%SZ")
         aware_dt = timezone.make_aware(naive_dt)
 
         transformed.append(
             {
-                "subscription": video["snippet"]["channelId"],
-                "title": video["snippet"]["title"],
-                "video_url": f"https://www.youtube.com/watch?v={video['id']}",
-                "video_image_url": video["snippet"]["thumbnails"]["medium"]["url"],
+                "subscription": fields["channel_id"],
+                "title": fields["title"],
+                "video_url": f"https://www.youtube.com/watch?v={fields['video_id']}",
+                "video_image_url": fields["image_url"],
                 "upload_time": aware_dt,
             }
         )
@@ -147,20 +320,16 @@ def transform_subscriptions(subscriptions):
     transformed_subscriptions = []
     channel_ids = []
     for subscription in subscriptions:
-        snippet = subscription.get("snippet", {})
-
-        title = snippet.get("title", "")
-        channel_id = snippet.get("resourceId", {}).get("channelId", "")
-        image_url = snippet.get("thumbnails", {}).get("medium", {}).get("url", "")
-        description = snippet.get("description", "")
+        fields = pluck(subscription, SUBSCRIPTION_ITEM_FIELDS, default="")
 
         transformed_subscriptions.append(
             {
-                "title": title,
-                "channel_id": channel_id,
-                "image_url": image_url,
-                "description": description,
+                "title": fields["title"],
+                "channel_id": fields["channel_id"],
+                "uploads_playlist_id": derive_uploads_playlist_id(fields["channel_id"]),
+                "image_url": fields["image_url"],
+                "description": fields["description"],
             }
         )
-        channel_ids.append(channel_id)
+        channel_ids.append(fields["channel_id"])
     return transformed_subscriptions, channel_ids
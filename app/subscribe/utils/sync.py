@@ -0,0 +1,240 @@
+from contextlib import contextmanager
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.models import Subscription, SubscriptionMembership
+from core.utils.hashing import content_hash
+from subscribe.utils.counters import refresh_collection_counts, refresh_group_counts
+from subscribe.utils.subscriptions import (
+    iter_youtube_subscription_pages,
+    transform_subscriptions,
+)
+
+
+# First key of the Postgres advisory locks taken per collection
+SYNC_LOCK_NAMESPACE = 5001
+
+SUBSCRIPTION_HASH_FIELDS = ["title", "description", "image_url"]
+
+
+def write_subscriptions_page(user_subscription_list, transformed_subscriptions):
+    """
+    Upsert one page of transformed subscriptions and link them to the user.
+
+    Channels are shared, so most of them are already stored unchanged by other
+    users' syncs. Rows whose content hash and playlist id match are not
+    rewritten. The page costs a constant number of queries whatever its size:
+    one read of the stored hashes, one
+    ``INSERT ... ON CONFLICT (channel_id) DO UPDATE`` per set of updated
+    fields, one select of the new ids, one insert of the missing links and
+    one recount of the collection.
+    Returns the number of written and unchanged channels.
+    """
+    # A single upsert cannot touch a row twice, so repeated channels are
+    # written once and items without a channel id are skipped
+    transformed_subscriptions = list(
+        {
+            data["channel_id"]: data
+            for data in transformed_subscriptions
+            if data["channel_id"]
+        }.values()
+    )
+    counts = {"written": 0, "unchanged": 0}
+    if not transformed_subscriptions:
+        return counts
+
+    channel_ids = [data["channel_id"] for data in transformed_subscriptions]
+    stored = {
+        channel_id: (subscription_id, stored_hash, playlist_id)
+        for channel_id, subscription_id, stored_hash, playlist_id in (
+            Subscription.objects.filter(channel_id__in=channel_ids).values_list(
+                "channel_id", "id", "content_hash", "uploads_playlist_id"
+            )
+        )
+    }
+
+    # Rows without a derivable playlist id must not erase a resolved one
+    with_playlist = []
+    without_playlist = []
+    for subscription_data in transformed_subscriptions:
+        subscription = Subscription(
+            channel_id=subscription_data["channel_id"],
+            title=subscription_data["title"],
+            description=subscription_data["description"],
+            image_url=subscription_data["image_url"],
+            uploads_playlist_id=subscription_data["uploads_playlist_id"],
+            content_hash=content_hash(
+                *(subscription_data[field] for field in SUBSCRIPTION_HASH_FIELDS)
+            ),
+        )
+        current = stored.get(subscription.channel_id)
+        if (
+            current
+            and current[1] == subscription.content_hash
+            and subscription.uploads_playlist_id in (None, current[2])
+        ):
+            counts["unchanged"] += 1
+        elif subscription.uploads_playlist_id:
+            with_playlist.append(subscription)
+        else:
+            without_playlist.append(subscription)
+
+    update_fields = SUBSCRIPTION_HASH_FIELDS + ["content_hash"]
+    new_channel_ids = [
+        channel_id for channel_id in channel_ids if channel_id not in stored
+    ]
+    with transaction.atomic():
+        for subscriptions, fields in (
+            (with_playlist, update_fields + ["uploads_playlist_id"]),
+            (without_playlist, update_fields),
+        ):
+            if subscriptions:
+                Subscription.objects.bulk_create(
+                    subscriptions,
+                    update_conflicts=True,
+                    unique_fields=["channel_id"],
+                    update_fields=fields,
+                )
+                counts["written"] += len(subscriptions)
+
+        subscription_ids = [current[0] for current in stored.values()]
+        if new_channel_ids:
+            # Upserted rows do not come back with their ids on every backend
+            subscription_ids += Subscription.objects.filter(
+                channel_id__in=new_channel_ids
+            ).values_list("id", flat=True)
+        SubscriptionMembership.objects.bulk_create(
+            [
+                SubscriptionMembership(
+                    subscription_id=subscription_id,
+                    collection=user_subscription_list,
+                )
+                for subscription_id in subscription_ids
+            ],
+            ignore_conflicts=True,
+        )
+        refresh_collection_counts([user_subscription_list.pk])
+
+    return counts
+
+
+def remove_unsynced_subscriptions(user_subscription_list, synced_channel_ids):
+    """
+    Unlink the user's subscriptions that were not seen during the sync.
+
+    Their group goes with the membership row, so the whole removal is a single
+    ``DELETE ... RETURNING`` whatever the number of channels.
+    Returns the number of removed links and of those that were in a group.
+    """
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {SubscriptionMembership._meta.db_table} membership "
+                f"USING {Subscription._meta.db_table} subscription "
+                "WHERE subscription.id = membership.subscription_id "
+                "AND membership.collection_id = %s "
+                "AND NOT subscription.channel_id = ANY(%s) "
+                "RETURNING membership.group_id",
+                [user_subscription_list.pk, list(synced_channel_ids)],
+            )
+            removed = [group_id for (group_id,) in cursor.fetchall()]
+        if not removed:
+            return {"removed": 0, "ungrouped": 0}
+
+        group_ids = {group_id for group_id in removed if group_id}
+
+        # Raw deletes bypass the m2m signals that maintain the counters
+        refresh_collection_counts([user_subscription_list.pk])
+        if group_ids:
+            refresh_group_counts(group_ids)
+
+    return {
+        "removed": len(removed),
+        "ungrouped": sum(1 for group_id in removed if group_id),
+    }
+
+
+def sync_user_subscriptions(user_subscription_list, access_token, on_progress=None):
+    """
+    Stream the user's YouTube subscriptions into the database page by page.
+
+    Only one page of API items is held in memory at a time. Removed channels are
+    unlinked after the last page, so a failed fetch never drops subscriptions.
+    ``on_progress`` is called with the running count after every page.
+    Returns the number of synced channels, of channel writes avoided because
+    the row was unchanged, and the removal counts.
+    """
+    synced_channel_ids = set()
+    writes_avoided = 0
+    pages = iter_youtube_subscription_pages(
+        access_token=access_token,
+        cache_scope=f"collection:{user_subscription_list.pk}",
+    )
+    for page in pages:
+        transformed_subscriptions, channel_ids = transform_subscriptions(
+            subscriptions=page
+        )
+        counts = write_subscriptions_page(
+            user_subscription_list, transformed_subscriptions
+        )
+        writes_avoided += counts["unchanged"]
+        synced_channel_ids.update(channel_ids)
+        if on_progress:
+            on_progress(len(synced_channel_ids))
+
+    stats = remove_unsynced_subscriptions(user_subscription_list, synced_channel_ids)
+    stats["synced"] = len(synced_channel_ids)
+    stats["writes_avoided"] = writes_avoided
+    return stats
+
+
+@contextmanager
+def collection_sync_lock(user_subscription_list):
+    """
+    Hold the sync lock of a collection, waiting for the current holder if any.
+
+    The lock is a Postgres session advisory lock, so pages still commit one by
+    one and job progress stays visible. It belongs to the connection rather
+    than to a transaction: with persistent connections (``conn_max_age``) the
+    session outlives the request, so the lock is always released explicitly.
+    Only a dropped connection releases it on its own.
+    """
+    key = (SYNC_LOCK_NAMESPACE, user_subscription_list.pk)
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_lock(%s, %s)", key)
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_unlock(%s, %s)", key)
+
+
+def sync_collection_once(
+    user_subscription_list, access_token, requested_at, on_progress=None
+):
+    """
+    Sync a collection unless a sync finished after ``requested_at``.
+
+    Concurrent callers queue on the collection lock. The first one syncs, the
+    others find the fresh ``last_data_sync`` once they get the lock and share
+    that result instead of calling YouTube again. Returns the sync stats, or
+    None when the result was shared.
+    """
+    with collection_sync_lock(user_subscription_list):
+        user_subscription_list.refresh_from_db(
+            fields=["last_data_sync", "subscriptions_count"]
+        )
+        last_data_sync = user_subscription_list.last_data_sync
+        if last_data_sync and last_data_sync >= requested_at:
+            return None
+
+        stats = sync_user_subscriptions(
+            user_subscription_list=user_subscription_list,
+            access_token=access_token,
+            on_progress=on_progress,
+        )
+        user_subscription_list.last_data_sync = timezone.now()
+        user_subscription_list.save(update_fields=["last_data_sync"])
+        user_subscription_list.refresh_from_db(fields=["subscriptions_count"])
+    return stats
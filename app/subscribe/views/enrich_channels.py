@@ -1,7 +1,4 @@
-from django.utils import timezone
-from datetime import timedelta
-
-from django.db.models import Prefetch, Q
+from django.conf import settings
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 from rest_framework.response import Response
@@ -10,20 +7,23 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
-from core.models import UserSubscriptionCollection, Subscription, Upload
+from core.models import UserSubscriptionCollection
 
-from subscribe.utils.subscriptions import (
-    get_upload_playlist_ids,
-    get_latest_uploads,
-    get_video_details,
-    transform_video_details,
+from subscribe.utils.enrichment import (
+    ENRICH_BATCH_SIZE,
+    enrich_subscriptions,
+    stale_subscriptions,
 )
+from subscribe.utils.quota import flush_quota_usage, plan_enrichment_batch
 
 
 class EnrichChannelsView(APIView):
     """
     EnrichChannelsView - handle user subscribers.
     * Requires token authentication.
+    * Requires the X-Google-Token header, unless the server has a
+      GOOGLE_API_KEY. Channel data is public, so the server key is then used
+      instead of the caller's token.
     """
 
     authentication_classes = [JWTAuthentication]
@@ -34,8 +34,8 @@ class EnrichChannelsView(APIView):
             OpenApiParameter(
                 "X-Google-Token",
                 OpenApiTypes.STR,
-                description="Google token",
-                required=True,
+                description="Google token, not needed when the server has an API key",
+                required=False,
                 location=OpenApiParameter.HEADER,
             )
         ],
@@ -44,64 +44,46 @@ class EnrichChannelsView(APIView):
         """
         Return a list of all user subscriptions.
         """
-        # Retrieve Google token from X-Google-Token header
-        google_token = request.headers.get("X-Google-Token")
-        if not google_token:
+        # Channel data is public, prefer the server API key so the responses
+        # are cached and shared across users
+        google_token = None
+        if not settings.GOOGLE_API_KEY:
+            google_token = request.headers.get("X-Google-Token")
+        if not (google_token or settings.GOOGLE_API_KEY):
             return Response(
                 {"error": "X-Google-Token header is missing"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
         try:
-            one_week_ago = timezone.now() - timedelta(weeks=1)
-
             collection = UserSubscriptionCollection.objects.get(
                 user=request.user.profile
             )
-            channels_ids = (
-                Subscription.objects.filter(
-                    Q(upload__last_sync__lt=one_week_ago) | Q(upload__isnull=True),
-                    users_list=collection,
-                )
-                .select_related("upload")
-                .order_by("-upload__last_sync")
-                .values_list("channel_id", "id")[:30]
+            batch_size = plan_enrichment_batch(
+                ENRICH_BATCH_SIZE, reserve=settings.YOUTUBE_QUOTA_ENRICHMENT_RESERVE
             )
+            if not batch_size:
+                return Response({"is_data_synced": False, "is_deferred": True})
 
-            ids_key_values = dict(channels_ids)
-
-            subscriptions_playlist_ids = get_upload_playlist_ids(
-                access_token=google_token, channel_ids=list(ids_key_values.keys())
-            )
-            latest_videos = get_latest_uploads(
-                access_token=google_token, playlist_ids=subscriptions_playlist_ids
+            subscriptions = list(
+                stale_subscriptions(collection=collection)[:batch_size]
             )
-            videos_detail = get_video_details(
-                access_token=google_token, video_ids=latest_videos
-            )
-
-            transformed_videos = transform_video_details(videos_detail)
 
-            for video in transformed_videos:
-                subscription_id = ids_key_values.get(video["subscription"])
-
-                if subscription_id:
-                    Upload.objects.update_or_create(
-                        subscription_id=subscription_id,
-                        defaults={
-                            "title": video["title"],
-                            "upload_time": video["upload_time"],
-                            "video_url": video["video_url"],
-                            "video_image_url": video["video_image_url"],
-                            "last_sync": timezone.now,
-                        },
-                    )
+            result = enrich_subscriptions(
+                subscriptions=subscriptions, access_token=google_token
+            )
 
             return Response(
                 {
                     "is_data_synced": True,
+                    "failed_playlists": list(result["failed_playlists"]),
+                    "inserted": result["inserted"],
+                    "updated": result["updated"],
+                    "unchanged": result["unchanged"],
                 }
             )
 
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        finally:
+            flush_quota_usage()
@@ -0,0 +1,49 @@
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from rest_framework import generics
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from core.models import Upload
+from core.utils.pagination import KeysetPagination
+from subscribe.serializers.subscriptions import FeedUploadSerializer
+
+
+class FeedView(generics.ListAPIView):
+    """
+    FeedView - return the newest uploads across the user's subscriptions
+    * Requires token authentication.
+    * Supports filtering by one of the user's groups.
+    * Supports keyset pagination, pass the returned `next` as `cursor`.
+    """
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    queryset = Upload.objects.all()
+    serializer_class = FeedUploadSerializer
+    pagination_class = KeysetPagination
+    # Backed by core_upload_feed_idx
+    keyset_ordering = ("-upload_time", "-id")
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("group", OpenApiTypes.INT, required=False),
+            OpenApiParameter("cursor", OpenApiTypes.STR, required=False),
+            OpenApiParameter("page_size", OpenApiTypes.INT, required=False),
+        ],
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        user_subscription_list = self.request.user.profile.user_subscription_list
+        membership = {"subscription__memberships__collection": user_subscription_list}
+
+        group_id = self.request.query_params.get("group")
+        if group_id:
+            if not group_id.isdigit():
+                raise ValidationError({"group": "A group id is expected."})
+            # The group is a column of the caller's membership row
+            membership["subscription__memberships__group"] = group_id
+        return self.queryset.select_related("subscription").filter(**membership)
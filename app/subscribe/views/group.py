@@ -1,4 +1,3 @@
-from django.db.models import Count
 from django.core.exceptions import ValidationError
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema, OpenApiResponse
@@ -13,13 +12,15 @@ from rest_framework.response import Response
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework import status, viewsets, generics, filters
 from core.models import Subscription, Group
-from core.utils.pagination import StandardResultsSetPagination
+from core.utils.pagination import OptInKeysetPagination
 from subscribe.serializers.group import (
     AddSubscriptionToGroupSerializer,
     GroupSerializer,
     GroupListSerializer,
+    group_preview_prefetch,
 )
 from subscribe.serializers.subscriptions import SubscriptionSerializer
+from subscribe.utils.groups import move_to_group
 
 
 class GroupViewSet(viewsets.ModelViewSet):
@@ -56,12 +57,7 @@ class GroupViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         user_subscription_list = self.request.user.profile.user_subscription_list
-        return (
-            self.queryset.filter(user_list=user_subscription_list)
-            .annotate(subscription_count=Count("subscriptions"))
-            .order_by("title")
-            .distinct()
-        )
+        return self.queryset.filter(user_list=user_subscription_list).order_by("title")
 
 
 @extend_schema(
@@ -92,10 +88,7 @@ def add_subscription_to_group(request, group_id):
         Subscription, pk=subscription_id, users_list=user_subscription_list
     )
 
-    current_group = subscription.group.filter(user_list=user_subscription_list).first()
-
-    if subscription and group != current_group:
-        group.subscriptions.add(subscription)
+    if move_to_group(user_subscription_list, [subscription.pk], group):
         serializer = SubscriptionSerializer(subscription)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -114,12 +107,7 @@ def remove_subscription_from_group(request, subscription_id):
     """
     subscription = get_object_or_404(Subscription, pk=subscription_id)
 
-    group = subscription.group.filter(
-        user_list=request.user.profile.user_subscription_list
-    ).first()
-
-    if group:
-        group.subscriptions.remove(subscription)
+    if move_to_group(request.user.profile.user_subscription_list, [subscription.pk]):
         return Response(
             data={"message": "Subscription removed from the group."},
             status=status.HTTP_200_OK,
@@ -137,14 +125,15 @@ class GetGroupListView(generics.ListAPIView):
     """
     GroupListView - return groups with subscription list
     * Supports filtering and sort.
-    * Supports pagination.
+    * Supports pagination by `page`, or by `cursor` once an empty one is sent.
     """
 
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
     queryset = Group.objects.all()
     serializer_class = GroupListSerializer
-    pagination_class = StandardResultsSetPagination
+    pagination_class = OptInKeysetPagination
+    page_size = 5
     filter_backends = [
         filters.OrderingFilter,
         filters.SearchFilter,
@@ -154,10 +143,8 @@ class GetGroupListView(generics.ListAPIView):
     ordering_fields = ["title"]
 
     def get_queryset(self):
-        self.pagination_class.page_size = 5
-
         return (
-            self.queryset.prefetch_related("subscriptions")
+            self.queryset.prefetch_related(group_preview_prefetch())
             .filter(
                 user_list=self.request.user.profile.user_subscription_list,
             )
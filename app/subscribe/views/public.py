@@ -9,8 +9,9 @@ from rest_framework.response import Response
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework import status, generics
 from core.models import Subscription, Group, Profile
-from core.utils.pagination import StandardResultsSetPagination
-from subscribe.serializers.group import GroupListSerializer
+from core.utils.pagination import OptInKeysetPagination
+from subscribe.filters import SubscriptionSearchFilter
+from subscribe.serializers.group import GroupListSerializer, group_preview_prefetch
 from subscribe.serializers.subscriptions import (
     SubscriptionSerializer,
 )
@@ -99,8 +100,8 @@ class GetSubscriptionsFromShareLinkViewSet(ListAPIView):
         try:
             group_id, user_list_id, _ = validate_temp_group_url(token=token)
             return self.queryset.filter(
-                group__id=group_id,
-                users_list__id=user_list_id,
+                memberships__collection_id=user_list_id,
+                memberships__group_id=group_id,
             ).order_by("id")
 
         except Exception as e:
@@ -162,22 +163,21 @@ class GetGroupInfoFromShareLinkViewSet(APIView):
 class GetUserGroupsView(generics.ListAPIView):
     """
     GetUserGroupsView - return groups with subscription list
-    * Supports pagination.
+    * Supports pagination by `page`, or by `cursor` once an empty one is sent.
     """
 
     queryset = Group.objects.all()
     serializer_class = GroupListSerializer
-    pagination_class = StandardResultsSetPagination
+    pagination_class = OptInKeysetPagination
+    page_size = 5
     search_fields = ["title"]
     ordering_fields = ["title"]
 
     def get_queryset(self):
         username = self.kwargs.get("username")
-        self.pagination_class.page_size = 5
-
         return (
             self.queryset.select_related("user_list__user")
-            .prefetch_related("subscriptions")
+            .prefetch_related(group_preview_prefetch())
             .filter(
                 user_list__user__username=username,
                 user_list__user__is_public=True,
@@ -219,6 +219,8 @@ class GetPublicGroupInfoViewSet(APIView):
 class GetPublicGroupSubscriptionsView(ListAPIView):
     queryset = Subscription.objects.all()
     serializer_class = SubscriptionSerializer
+    filter_backends = [SubscriptionSearchFilter]
+    search_fields = ["title", "description"]
 
     def get_queryset(self):
         group_id = self.kwargs.get("group_id", None)
@@ -248,5 +250,5 @@ class GetPublicGroupSubscriptionsView(ListAPIView):
                 status=status.HTTP_400_BAD_REQUEST,
                 data={"error": "Failed to fetch group or no subscriptions found."},
             )
-        serializer = self.get_serializer(queryset, many=True)
+        serializer = self.get_serializer(self.filter_queryset(queryset), many=True)
         return Response(serializer.data)
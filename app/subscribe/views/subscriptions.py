@@ -10,15 +10,17 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework import status, generics
-from core.models import Subscription, UserSubscriptionCollection
-from core.utils.pagination import StandardResultsSetPagination
-from subscribe.filters import SubscriptionFilter
-from subscribe.serializers.subscriptions import DetailedSubscriptionSerializer
-
-from subscribe.utils.subscriptions import (
-    get_youtube_subscriptions,
-    transform_subscriptions,
+from core.models import Subscription, SyncJob, UserSubscriptionCollection
+from core.utils.pagination import OptInKeysetPagination
+from subscribe.filters import SubscriptionFilter, SubscriptionSearchFilter
+from subscribe.serializers.subscriptions import (
+    DetailedSubscriptionSerializer,
+    collection_group_prefetch,
+    SyncJobSerializer,
 )
+from subscribe.utils.jobs import enqueue_sync_job
+from subscribe.utils.quota import can_afford, estimate_sync_cost, flush_quota_usage
+from subscribe.utils.sync import sync_collection_once
 
 
 class SubscriptionsView(APIView):
@@ -38,7 +40,14 @@ class SubscriptionsView(APIView):
                 description="Google token",
                 required=True,
                 location=OpenApiParameter.HEADER,
-            )
+            ),
+            OpenApiParameter(
+                "mode",
+                OpenApiTypes.STR,
+                description="'async' to queue the sync and return a job id",
+                required=False,
+                enum=["async"],
+            ),
         ],
     )
     def get(self, request):
@@ -53,6 +62,7 @@ class SubscriptionsView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        requested_at = timezone.now()
         try:
             user_subscription_list, created = (
                 UserSubscriptionCollection.objects.update_or_create(
@@ -67,7 +77,7 @@ class SubscriptionsView(APIView):
 
             # We sync data from YouTube only once a week
             if time_difference <= timedelta(days=7) and not created:
-                subscriptions_count = user_subscription_list.subscriptions.count()
+                subscriptions_count = user_subscription_list.subscriptions_count
                 return Response(
                     {
                         "subscriptions_count": subscriptions_count,
@@ -76,40 +86,39 @@ class SubscriptionsView(APIView):
                     }
                 )
 
-            subscriptions = get_youtube_subscriptions(access_token=google_token)
-            transformed_subscriptions, _ = transform_subscriptions(
-                subscriptions=subscriptions
-            )
+            subscriptions_count = user_subscription_list.subscriptions_count
+            if not can_afford(estimate_sync_cost(subscriptions_count)):
+                # Keep serving the last synced data until the quota day rolls over
+                return Response(
+                    {
+                        "subscriptions_count": subscriptions_count,
+                        "last_sync_date": user_subscription_list.last_data_sync,
+                        "is_data_synced": False,
+                        "is_deferred": True,
+                    }
+                )
 
-            existing_subscriptions = user_subscription_list.subscriptions.all()
-            # remove subscription from user data
-            subscriptions_to_remove = existing_subscriptions.exclude(
-                channel_id__in=[sub["channel_id"] for sub in transformed_subscriptions]
-            )
-            user_subscription_list.subscriptions.remove(*subscriptions_to_remove)
-
-            for subscription_to_remove in subscriptions_to_remove:
-                group = subscription_to_remove.group.filter(
-                    user_list=user_subscription_list
-                ).first()
-                if group:
-                    group.subscriptions.remove(subscription_to_remove)
-
-            # Sync the fetched subscriptions with the user's subscriptions
-            for subscription_data in transformed_subscriptions:
-                subscription, _ = Subscription.objects.update_or_create(
-                    channel_id=subscription_data["channel_id"],
-                    defaults={
-                        "title": subscription_data["title"],
-                        "description": subscription_data["description"],
-                        "image_url": subscription_data["image_url"],
+            if request.query_params.get("mode") == "async":
+                job = enqueue_sync_job(user_subscription_list, google_token)
+                return Response(
+                    {
+                        "job_id": job.id,
+                        "status": job.status,
+                        "subscriptions_count": subscriptions_count,
+                        "last_sync_date": user_subscription_list.last_data_sync,
+                        "is_data_synced": False,
                     },
+                    status=status.HTTP_202_ACCEPTED,
                 )
-                user_subscription_list.subscriptions.add(subscription)
 
-            subscriptions_count = user_subscription_list.subscriptions.count()
-            user_subscription_list.last_data_sync = timezone.now()
-            user_subscription_list.save()
+            # Waits for a sync already running for this user and shares it
+            sync_collection_once(
+                user_subscription_list=user_subscription_list,
+                access_token=google_token,
+                requested_at=requested_at,
+            )
+
+            subscriptions_count = user_subscription_list.subscriptions_count
 
             return Response(
                 {
@@ -121,34 +130,53 @@ class SubscriptionsView(APIView):
 
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        finally:
+            flush_quota_usage()
 
 
 class SubscriptionsListView(generics.ListAPIView):
     """
     SubscriptionsListView - return subscription list
     * Supports filtering by specific group, 'ungroup', or 'all'.
-    * Supports pagination.
+    * Supports ranked search over titles and descriptions.
+    * Supports pagination by `page`, or by `cursor` once an empty one is sent.
     """
 
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
     queryset = Subscription.objects.all()
     serializer_class = DetailedSubscriptionSerializer
-    pagination_class = StandardResultsSetPagination
+    pagination_class = OptInKeysetPagination
     filter_backends = [
+        SubscriptionSearchFilter,
         filters.OrderingFilter,
-        filters.SearchFilter,
         DjangoFilterBackend,
     ]
-    search_fields = ["title"]
+    search_fields = ["title", "description"]
     ordering_fields = ["title"]
     filterset_class = SubscriptionFilter
 
     def get_queryset(self):
+        collection = self.request.user.profile.user_subscription_list
         return (
-            self.queryset.prefetch_related("group")
-            .filter(
-                users_list=self.request.user.profile.user_subscription_list,
-            )
+            self.queryset.select_related("upload")
+            .prefetch_related(collection_group_prefetch(collection))
+            .filter(users_list=collection)
             .order_by("id")
         )
+
+
+class SyncJobStatusView(generics.RetrieveAPIView):
+    """
+    SyncJobStatusView - report the progress and result of a sync job
+    * Requires token authentication.
+    """
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    queryset = SyncJob.objects.all()
+    serializer_class = SyncJobSerializer
+    lookup_url_kwarg = "job_id"
+
+    def get_queryset(self):
+        return self.queryset.filter(collection__user=self.request.user.profile)
@@ -1,12 +1,22 @@
 import requests
 from typing import Dict, Any, Tuple
 from django.conf import settings
+from django.contrib.postgres.search import TrigramSimilarity
 from django.core.exceptions import ValidationError
+from django.db.models.functions import Collate, Lower
+
+from core.models import Profile
+from core.utils.http import get_google_session
 from user.serializers import CustomTokenObtainPairSerializer
 
 GOOGLE_ID_TOKEN_INFO_URL = "https://www.googleapis.com/oauth2/v3/tokeninfo"
-GOOGLE_ACCESS_TOKEN_OBTAIN_URL = "https://oauth2.googleapis.com/token"
-GOOGLE_USER_INFO_URL = "https://www.googleapis.com/oauth2/v3/userinfo"
+
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 20
+# Hot prefixes are typed by many users at once, a short TTL keeps them fresh
+AUTOCOMPLETE_CACHE_TIMEOUT = 30
+# Trigrams cannot narrow down shorter queries
+TRIGRAM_MIN_LENGTH = 3
 
 
 def generate_tokens_for_user(user):
@@ -32,7 +42,9 @@ def google_get_tokens(*, code: str, redirect_uri: str) -> Tuple[str, str]:
     }
 
     try:
-        response = requests.post(GOOGLE_ACCESS_TOKEN_OBTAIN_URL, data=data)
+        response = get_google_session().post(
+            settings.GOOGLE_OAUTH2_TOKEN_URL, data=data
+        )
 
         if not response.ok:
             raise ValidationError(response.json())
@@ -59,7 +71,7 @@ def google_refresh_access_token(refresh_token: str) -> str:
         "grant_type": "refresh_token",
     }
 
-    response = requests.post(GOOGLE_ACCESS_TOKEN_OBTAIN_URL, data=data)
+    response = get_google_session().post(settings.GOOGLE_OAUTH2_TOKEN_URL, data=data)
 
     if not response.ok:
         raise ValidationError(
@@ -71,7 +83,9 @@ def google_refresh_access_token(refresh_token: str) -> str:
 
 
 def google_get_user_info(*, access_token: str) -> Dict[str, Any]:
-    response = requests.get(GOOGLE_USER_INFO_URL, params={"access_token": access_token})
+    response = get_google_session().get(
+        settings.GOOGLE_USER_INFO_URL, params={"access_token": access_token}
+    )
 
     if not response.ok:
         raise ValidationError("Failed to obtain user info from Google.")
@@ -99,3 +113,36 @@ def get_error_message(exc) -> str:
         error_msg = str(exc)
 
     return error_msg
+
+
+def autocomplete_public_profiles(query, limit=AUTOCOMPLETE_LIMIT):
+    """
+    Return up to ``limit`` public profiles matching ``query``, case-insensitively.
+
+    Usernames that start with ``query`` come first, in username order. The
+    prefix is a ``LIKE 'prefix%'`` on lower(username) in the C collation, so
+    Postgres walks the partial index of public profiles in order and stops at
+    ``limit``. A short page is then topped up with usernames containing the
+    query, closest first, through the trigram index. No count is ever taken.
+    """
+    prefix = query.strip().lower()
+    if not prefix:
+        return []
+
+    public = Profile.objects.filter(is_public=True).only(
+        "id", "username", "image_url", "description"
+    )
+    profiles = list(
+        public.annotate(username_key=Collate(Lower("username"), "C"))
+        .filter(username_key__startswith=prefix)
+        .order_by("username_key")[:limit]
+    )
+
+    if len(profiles) < limit and len(prefix) >= TRIGRAM_MIN_LENGTH:
+        profiles += (
+            public.filter(username__icontains=prefix)
+            .exclude(pk__in=[profile.pk for profile in profiles])
+            .annotate(similarity=TrigramSimilarity("username", prefix))
+            .order_by("-similarity", "id")[: limit - len(profiles)]
+        )
+    return profiles
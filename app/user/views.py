@@ -1,4 +1,5 @@
 from http import HTTPStatus
+import hashlib
 import random
 from urllib.parse import urlencode
 
@@ -10,15 +11,20 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework import filters
 from django.conf import settings
+from django.core.cache import cache
 from django.shortcuts import redirect
 from rest_framework.response import Response
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from core.utils.auth import IsCreator
-from core.utils.pagination import StandardResultsSetPagination
+from core.utils.pagination import OptInKeysetPagination
 from user.mixins import PublicApiMixin, ApiErrorsMixin
 from user.utils import (
+    AUTOCOMPLETE_CACHE_TIMEOUT,
+    AUTOCOMPLETE_LIMIT,
+    AUTOCOMPLETE_MAX_LIMIT,
+    autocomplete_public_profiles,
     google_get_tokens,
     google_get_user_info,
     generate_tokens_for_user,
@@ -320,18 +326,65 @@ class GetPublicUserProfileView(APIView):
 
 
 class GetPublicUsersView(generics.ListAPIView):
+    """
+    GetPublicUsersView - return public profiles
+    * Supports search by username and pagination by `page` or `cursor`.
+    * ``mode=autocomplete`` returns up to ``limit`` prefix matches, no count.
+    """
+
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = GetPublicUserProfileSerializer
-    pagination_class = StandardResultsSetPagination
+    pagination_class = OptInKeysetPagination
     queryset = Profile.objects.all()
     filter_backends = [
         filters.SearchFilter,
     ]
     search_fields = ["username"]
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "mode",
+                OpenApiTypes.STR,
+                description="'autocomplete' for a bounded list of prefix matches",
+                required=False,
+                enum=["autocomplete"],
+            ),
+            OpenApiParameter(
+                "limit",
+                OpenApiTypes.INT,
+                description=f"Autocomplete results, at most {AUTOCOMPLETE_MAX_LIMIT}",
+                required=False,
+            ),
+        ],
+    )
+    def get(self, request, *args, **kwargs):
+        if request.query_params.get("mode") == "autocomplete":
+            return self.autocomplete(request)
+        return super().get(request, *args, **kwargs)
+
     def get_queryset(self):
-        search_query = self.request.query_params.get("search")
-        return self.queryset.filter(
-            is_public=True, username__icontains=search_query
-        ).order_by("id")
+        # SearchFilter applies the search
+        return self.queryset.filter(is_public=True).order_by("id")
+
+    def autocomplete(self, request):
+        query = request.query_params.get("search", "")[
+            : Profile._meta.get_field("username").max_length
+        ]
+        try:
+            limit = int(request.query_params.get("limit", AUTOCOMPLETE_LIMIT))
+        except ValueError:
+            limit = AUTOCOMPLETE_LIMIT
+        limit = min(max(limit, 1), AUTOCOMPLETE_MAX_LIMIT)
+
+        key = (
+            "public-users-autocomplete:"
+            + hashlib.sha256(f"{limit}:{query.strip().lower()}".encode()).hexdigest()
+        )
+        results = cache.get(key)
+        if results is None:
+            profiles = autocomplete_public_profiles(query, limit)
+            results = list(self.get_serializer(profiles, many=True).data)
+            cache.set(key, results, AUTOCOMPLETE_CACHE_TIMEOUT)
+        return Response({"results": results})